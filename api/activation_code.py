@@ -0,0 +1,102 @@
+"""
+激活码规范化与格式校验
+从聊天软件复制的激活码常带有空格、全角字符、各种破折号或小写字母，
+规范化后同一个激活码只有一种写法，缓存、请求合并和去重都以规范化后的激活码为键。
+
+格式：可选字母前缀 + 3 段或 4 段、每段 4 位字母或数字，例如
+QWER-XDKO-DWJN-R21Q、CARD-QWER-XDKO-DWJN、VIP-ABCD-EF12-3456
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+ACTIVATION_CODE_PATTERN = re.compile(r'(?:[A-Z]+-)?[A-Z0-9]{4}(?:-[A-Z0-9]{4}){2,3}')
+
+# 超过此长度的输入不做规范化，直接视为无效
+MAX_INPUT_LENGTH = 64
+
+_DASHES = '‐‑‒–—―−ー﹘﹣－'
+_WHITESPACE = ' \t\r\n\v\f ​‌‍⁠　﻿'
+
+
+def _build_translation() -> dict:
+    """一次 str.translate 完成：全角转半角、破折号统一为 -、删除空白、小写转大写"""
+    table = {}
+    for offset in range(26):
+        table[ord('a') + offset] = chr(ord('A') + offset)
+        table[0xFF21 + offset] = chr(ord('A') + offset)  # 全角 A-Z
+        table[0xFF41 + offset] = chr(ord('A') + offset)  # 全角 a-z
+    for offset in range(10):
+        table[0xFF10 + offset] = chr(ord('0') + offset)  # 全角 0-9
+    for dash in _DASHES:
+        table[ord(dash)] = '-'
+    for space in _WHITESPACE:
+        table[ord(space)] = None
+    return table
+
+
+_TRANSLATION = _build_translation()
+
+
+def normalize_activation_code(code: str) -> str:
+    """
+    规范化激活码（不校验格式）
+
+    :param code: 原始输入
+    :return: 规范化后的激活码
+    """
+    # 已经是规范格式的输入（绝大多数请求）直接返回
+    if ACTIVATION_CODE_PATTERN.fullmatch(code):
+        return code
+    return code.translate(_TRANSLATION)
+
+
+def parse_activation_code(code: str) -> Optional[str]:
+    """
+    规范化并校验激活码
+
+    :param code: 原始输入
+    :return: 规范化后的激活码，格式不正确时返回 None
+    """
+    if ACTIVATION_CODE_PATTERN.fullmatch(code):
+        return code
+    if len(code) > MAX_INPUT_LENGTH:
+        return None
+    code = code.translate(_TRANSLATION)
+    if ACTIVATION_CODE_PATTERN.fullmatch(code):
+        return code
+    return None
+
+
+def is_valid_activation_code(code: str) -> bool:
+    """
+    校验激活码格式（规范化后）
+
+    :param code: 原始输入
+    :return: 是否有效
+    """
+    return parse_activation_code(code) is not None
+
+
+def parse_activation_codes(raw_codes: Iterable) -> Tuple[List[str], List[str]]:
+    """
+    批量规范化激活码：跳过空行，按规范化后的激活码去重
+
+    :param raw_codes: 原始输入
+    :return: (有效激活码列表, 格式不正确的原始输入列表)，均保持输入顺序
+    """
+    codes, invalid, seen = [], [], set()
+    for raw in raw_codes:
+        raw = str(raw).strip()
+        if not raw:
+            continue
+        code = parse_activation_code(raw)
+        key = code if code is not None else raw.upper()
+        if key in seen:
+            continue
+        seen.add(key)
+        if code is not None:
+            codes.append(code)
+        else:
+            invalid.append(raw)
+    return codes, invalid
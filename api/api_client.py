@@ -12,181 +12,979 @@ if result['success']:
 """
 
 import requests
-import json
+import os
 import re
-from typing import Dict, Optional, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, Optional, Any, Tuple
 from urllib.parse import urlparse
 
+from urllib3.exceptions import NewConnectionError
 
-class ChongzhiProApiClient:
+import json_codec
+from metrics import UPSTREAM_OVERSIZED_RESPONSES, UPSTREAM_PHASE_SECONDS, UPSTREAM_RETRIES, RECHARGE_STEP_SECONDS
+from resilience import Deadline, create_retry_policy_from_env, get_breaker, get_retry_budget
+from transport import PooledTransport, capture_phases, get_shared_transport
+
+
+# 获取Session的方式：
+# head   - HEAD请求只读响应头，拿不到Cookie时回退到 stream（默认）
+# stream - 流式GET，只读响应头取Cookie；不超过 SESSION_DRAIN_MAX_BYTES 的剩余正文读完（不解码）以便连接回到连接池
+# full   - 完整GET主页（旧行为）
+SESSION_BOOTSTRAP_MODES = ('head', 'stream', 'full')
+
+# 各接口的默认读取超时（秒）：获取Session和验证应很快返回，充值接口允许更长时间
+DEFAULT_READ_TIMEOUTS = {
+    'get_session': 10.0,
+    'verify_activation_code': 10.0,
+    'reuse_record': 30.0,
+    'submit_recharge': 30.0,
+    'update_token_and_recharge': 30.0,
+}
+
+# 上游暂时不可用、可以重试的HTTP状态码
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+# 上游返回这些状态码时认为Session已失效
+SESSION_REJECTED_HTTP_CODES = (401, 403, 419, 440)
+
+# 流式读取响应正文的块大小（字节）
+BODY_CHUNK_SIZE = 64 * 1024
+
+# stream 方式获取Session后最多读完多少字节剩余正文以复用连接，超过后直接关闭（连接随之丢弃）
+SESSION_DRAIN_MAX_BYTES = 64 * 1024
+
+# JSON解析失败时写入 raw_response 的最多字符数
+RAW_RESPONSE_PREVIEW_CHARS = 512
+
+
+class ResponseTooLarge(Exception):
+    """上游响应正文超过 max_response_bytes"""
+    
+    def __init__(self, size: int):
+        super().__init__(f'响应正文超过上限（已读取 {size} 字节）')
+        self.size = size
+
+
+class UpstreamSession(str):
+    """
+    上游会话句柄
+    本身就是 Session ID 字符串，可以直接存入Flask会话或与旧代码互换使用；
+    同时保存获取会话时下发的全部Cookie、拼好的 Cookie 请求头以及获取时间
+    """
+    
+    def __new__(cls, session_id: str, cookies: Dict[str, str] = None):
+        """
+        构造函数
+        :param session_id: ios_gpt_session 的值
+        :param cookies: 可选，获取会话时下发的其他Cookie
+        """
+        handle = super().__new__(cls, session_id)
+        handle.cookies = {'ios_gpt_session': session_id}
+        for name, value in (cookies or {}).items():
+            if name != 'ios_gpt_session':
+                handle.cookies[name] = value
+        handle.cookie_header = '; '.join(f'{name}={value}' for name, value in handle.cookies.items())
+        handle.created_at = time.monotonic()
+        return handle
+    
+    def __reduce__(self):
+        return UpstreamSession, (str(self), self.cookies)
+    
+    @property
+    def age(self) -> float:
+        """获取后经过的秒数"""
+        return time.monotonic() - self.created_at
+
+
+class SessionBootstrapStats:
+    """获取Session的流量统计，用于观察跳过主页正文节省的带宽"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._acquisitions = {mode: 0 for mode in SESSION_BOOTSTRAP_MODES}
+        self._head_fallbacks = 0
+        self._body_bytes_skipped = 0
+        self._body_bytes_read = 0
+        self._unknown_length = 0
+    
+    def record(self, mode: str, body_skipped: Optional[int] = 0, body_read: int = 0):
+        """
+        记录一次成功获取
+        
+        :param mode: 获取方式
+        :param body_skipped: 跳过的正文字节数（None 表示响应未给出长度）
+        :param body_read: 实际读取的正文字节数
+        """
+        with self._lock:
+            self._acquisitions[mode] += 1
+            if body_skipped is None:
+                self._unknown_length += 1
+            else:
+                self._body_bytes_skipped += body_skipped
+            self._body_bytes_read += body_read
+    
+    def record_fallback(self):
+        """记录一次 HEAD 回退到 GET"""
+        with self._lock:
+            self._head_fallbacks += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取统计快照
+        
+        :return: 统计信息
+        """
+        with self._lock:
+            return {
+                'acquisitions': dict(self._acquisitions),
+                'head_fallbacks': self._head_fallbacks,
+                'body_bytes_skipped': self._body_bytes_skipped,
+                'body_bytes_read': self._body_bytes_read,
+                'unknown_length': self._unknown_length,
+            }
+
+
+session_bootstrap_stats = SessionBootstrapStats()
+
+
+class ApiClientBase:
+    """
+    客户端公共部分：配置、请求构建与响应解析
+    同步客户端 ChongzhiProApiClient 与异步客户端 AsyncChongzhiProApiClient 共用
+    """
+    
     def __init__(self, base_url: str = None):
         """
         构造函数
-        :param base_url: 可选，自定义基础URL
+        :param base_url: 可选，自定义基础URL（默认读取 CHONGZHI_BASE_URL）
         """
-        self.base_url = base_url or 'https://chongzhi.pro'
+        # 各接口的URL和固定请求头，修改 base_url 或 user_agent 时重新构建
+        self._request_templates = None
+        self.base_url = base_url or os.environ.get('CHONGZHI_BASE_URL') or 'https://chongzhi.pro'
         self.timeout = 30
+        # 建立连接的超时与读取超时分开设置，上游不可达时尽快失败
+        self.connect_timeout = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', '5'))
+        self.read_timeouts = dict(DEFAULT_READ_TIMEOUTS)
+        # full_recharge_process 的总时间预算
+        self.recharge_deadline = float(os.environ.get('RECHARGE_DEADLINE', '45'))
+        # 响应正文上限，超过后停止读取（上游返回大段HTML错误页时不占用大量内存）
+        self.max_response_bytes = int(os.environ.get('UPSTREAM_MAX_RESPONSE_BYTES', str(1024 * 1024)))
+        # 失败重试：退避策略按实例配置，重试预算进程内共享
+        self.retry_policy = create_retry_policy_from_env()
+        self.retry_budget = get_retry_budget()
         self.user_agent = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Mobile/15E148 Safari/604.1'
-        
-        # 创建session对象以便复用连接
-        self.session = requests.Session()
-        self.session.verify = False  # 跳过SSL验证（对应PHP中的CURLOPT_SSL_VERIFYPEER => false）
-        
-    def get_session(self) -> Optional[str]:
+        self.session_bootstrap = os.environ.get('SESSION_BOOTSTRAP', 'head')
+    
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+    
+    @base_url.setter
+    def base_url(self, value: str):
+        self._base_url = value
+        self._request_templates = None
+    
+    @property
+    def user_agent(self) -> str:
+        return self._user_agent
+    
+    @user_agent.setter
+    def user_agent(self, value: str):
+        self._user_agent = value
+        self._request_templates = None
+    
+    def _build_request_templates(self) -> Dict[str, Tuple[str, Dict[str, str]]]:
         """
-        获取Session ID
-        访问主页获取 ios_gpt_session Cookie
+        构建各接口的URL和固定请求头（不含Cookie）
+        每个接口的请求头顺序与浏览器抓包一致，不要调整
         
-        :return: Session ID 或 None（失败时）
+        :return: 接口类型 -> (URL, 请求头)
         """
-        url = f"{self.base_url}/"
+        base_url = self.base_url
+        user_agent = self.user_agent
+        host = urlparse(base_url).netloc
+        referer = f"{base_url}/"
         
-        headers = {
+        session_headers = {
             'Accept-Encoding': 'gzip, deflate, br',
-            'User-Agent': self.user_agent,
-            'Host': urlparse(self.base_url).netloc,
+            'User-Agent': user_agent,
+            'Host': host,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
         }
         
+        verify_headers = {
+            'User-Agent': user_agent,
+            'Accept': 'application/json',
+            'Referer': referer,
+            'Content-Type': 'application/json',
+            'Origin': base_url,
+            'Host': host,
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
+        }
+        
+        # 复用记录与更新Token使用同一个接口和请求头
+        reuse_headers = {
+            'User-Agent': user_agent,
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
+            'Content-Type': 'application/json',
+            'Referer': referer,
+            'Host': host,
+            'Accept': '*/*',
+            'Origin': base_url,
+        }
+        
+        submit_headers = {
+            'Origin': base_url,
+            'User-Agent': user_agent,
+            'Accept': 'application/json',
+            'Host': host,
+            'Content-Type': 'application/json',
+            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
+            'Referer': referer,
+            'Accept-Encoding': 'gzip, deflate, br',
+        }
+        
+        return {
+            'session': (referer, session_headers),
+            'verify': (f"{base_url}/api-verify.php", verify_headers),
+            'reuse': (f"{base_url}/api-recharge-reuse.php", reuse_headers),
+            'submit': (f"{base_url}/simple-submit-recharge.php", submit_headers),
+        }
+    
+    def _request_template(self, kind: str) -> Tuple[str, Dict[str, str]]:
+        """
+        获取接口的URL和固定请求头（首次使用或 base_url/user_agent 变化后重新构建）
+        
+        :param kind: session、verify、reuse 或 submit
+        :return: (URL, 请求头)，请求头为共享对象，不要修改
+        """
+        templates = self._request_templates
+        if templates is None:
+            templates = self._request_templates = self._build_request_templates()
+        return templates[kind]
+    
+    @staticmethod
+    def _with_cookie(headers: Dict[str, str], session: str) -> Dict[str, str]:
+        """
+        复制固定请求头并加上 Session Cookie
+        
+        :param headers: 固定请求头
+        :param session: UpstreamSession（使用预先拼好的Cookie头）或 Session ID 字符串
+        :return: 请求头
+        """
+        headers = headers.copy()
+        if isinstance(session, UpstreamSession):
+            headers['Cookie'] = session.cookie_header
+        else:
+            headers['Cookie'] = 'ios_gpt_session=' + session
+        return headers
+    
+    def _session_request(self) -> Tuple[str, Dict[str, str]]:
+        """构建获取Session请求"""
+        return self._request_template('session')
+    
+    @staticmethod
+    def _extract_session_id(cookies, set_cookie_header: str) -> Optional['UpstreamSession']:
+        """
+        从响应Cookie中提取 ios_gpt_session，连同其余Cookie一起封装为会话句柄
+        
+        :param cookies: 响应Cookie（支持 in、下标访问和 items()）
+        :param set_cookie_header: Set-Cookie 响应头
+        :return: UpstreamSession 或 None
+        """
         try:
-            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            cookie_values = dict(cookies.items())
+        except Exception:
+            # 同名Cookie冲突等情况只保留 ios_gpt_session
+            cookie_values = {}
+        
+        if 'ios_gpt_session' in cookies:
+            return UpstreamSession(cookies['ios_gpt_session'], cookie_values)
             
-            if response.status_code != 200:
-                return None
-                
-            # 提取 ios_gpt_session
-            cookies = response.cookies
-            if 'ios_gpt_session' in cookies:
-                return cookies['ios_gpt_session']
-                
-            # 如果cookie中没有，尝试从Set-Cookie头中提取
-            set_cookie_header = response.headers.get('Set-Cookie', '')
-            match = re.search(r'ios_gpt_session=([^;]+)', set_cookie_header)
-            if match:
-                return match.group(1)
-                
+        # 如果cookie中没有，尝试从Set-Cookie头中提取
+        match = re.search(r'ios_gpt_session=([^;]+)', set_cookie_header)
+        if match:
+            return UpstreamSession(match.group(1), cookie_values)
+            
+        return None
+    
+    @staticmethod
+    def _content_length(response) -> Optional[int]:
+        """
+        读取响应头中的正文长度
+        
+        :param response: 响应对象
+        :return: 字节数，未给出或无法解析时返回 None
+        """
+        try:
+            return int(response.headers.get('Content-Length'))
+        except (TypeError, ValueError):
             return None
+    
+    def _verify_request(self, session: str, activation_code: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """构建验证激活码请求"""
+        url, headers = self._request_template('verify')
+        
+        payload = {
+            'activation_code': activation_code
+        }
+        
+        return url, payload, self._with_cookie(headers, session)
+    
+    def _reuse_request(self, session: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """构建复用充值记录请求"""
+        url, headers = self._request_template('reuse')
+        
+        payload = {
+            'action': 'reuse_record'
+        }
+        
+        return url, payload, self._with_cookie(headers, session)
+    
+    def _submit_request(self, session: str, user_data_json: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """构建第一次充值请求"""
+        url, headers = self._request_template('submit')
+        
+        payload = {
+            'user_data': user_data_json
+        }
+        
+        return url, payload, self._with_cookie(headers, session)
+    
+    def _update_token_request(self, session: str, card_code: str, user_data_json: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """构建更新Token并充值请求"""
+        url, headers = self._request_template('reuse')
+        
+        payload = {
+            'action': 'update_token_and_recharge',
+            'card_code': card_code,
+            'json_data': user_data_json
+        }
+        
+        return url, payload, self._with_cookie(headers, session)
+    
+    @staticmethod
+    def _handle_response(response, body: bytes = None) -> Dict[str, Any]:
+        """
+        将HTTP响应转换为结果字典
+        同步和异步客户端共用，保证两者返回完全一致的结构
+        
+        :param response: 响应对象（需提供 status_code，未传 body 时还需 content）
+        :param body: 可选，已读取的响应正文
+        :return: 响应结果
+        """
+        if body is None:
+            body = response.content
+        
+        # 检查HTTP状态码
+        if response.status_code not in [200, 201]:
+            return {
+                'success': False,
+                'error': f'HTTP错误: {response.status_code}',
+                'http_code': response.status_code
+            }
+        
+        # 尝试解析JSON响应（直接解析响应字节）
+        try:
+            result = json_codec.loads(body)
+        except json_codec.JSONDecodeError as e:
+            # 只保留正文开头一段，避免把整页HTML返回给浏览器
+            raw_response = body[:RAW_RESPONSE_PREVIEW_CHARS * 4].decode('utf-8', 'replace')
+            if len(raw_response) > RAW_RESPONSE_PREVIEW_CHARS:
+                raw_response = raw_response[:RAW_RESPONSE_PREVIEW_CHARS] + '…'
+            return {
+                'success': False,
+                'error': f'JSON解析失败: {str(e)}',
+                'raw_response': raw_response,
+                'http_code': response.status_code
+            }
+        
+        # 添加HTTP状态码到结果中
+        result['http_code'] = response.status_code
+        return result
+    
+    def _check_declared_length(self, response):
+        """
+        响应头声明的正文长度已超过上限时直接放弃读取
+        
+        :param response: 响应对象
+        :raises ResponseTooLarge: 超过 max_response_bytes
+        """
+        declared = self._content_length(response)
+        if declared is not None and declared > self.max_response_bytes:
+            raise ResponseTooLarge(declared)
+    
+    def _oversized_result(self, endpoint: str, response) -> Dict[str, Any]:
+        """
+        构建响应过大的失败结果并计数
+        
+        :param endpoint: 接口名
+        :param response: 响应对象
+        :return: 失败结果
+        """
+        UPSTREAM_OVERSIZED_RESPONSES.inc(endpoint)
+        return {
+            'success': False,
+            'error': f'响应过大: 超过 {self.max_response_bytes} 字节',
+            'http_code': response.status_code,
+            'response_too_large': True
+        }
+    
+    @staticmethod
+    def _failure_result(error: str, request_sent: bool = True) -> Dict[str, Any]:
+        """
+        构建网络层失败结果（未拿到HTTP响应）
+        
+        :param error: 错误信息
+        :param request_sent: 请求是否可能已到达上游（建连失败时为 False，可以安全重发）
+        :return: 失败结果
+        """
+        result = {
+            'success': False,
+            'error': error,
+            'http_code': 0
+        }
+        if not request_sent:
+            result['request_sent'] = False
+        return result
+    
+    def _timeouts(self, endpoint: str, deadline: Deadline = None) -> Tuple[float, float]:
+        """
+        计算单次调用的连接超时和读取超时
+        
+        :param endpoint: 接口名
+        :param deadline: 可选，总时间预算，超时不超过剩余时间
+        :return: (连接超时, 读取超时)
+        """
+        read_timeout = self.read_timeouts.get(endpoint, self.timeout)
+        connect_timeout = min(self.connect_timeout, read_timeout)
+        if deadline is not None:
+            connect_timeout = deadline.clamp(connect_timeout)
+            read_timeout = deadline.clamp(read_timeout)
+        return connect_timeout, read_timeout
+    
+    @staticmethod
+    def _deadline_exceeded_result() -> Dict[str, Any]:
+        """
+        构建总时间预算用尽的失败结果（未发出请求）
+        
+        :return: 失败结果
+        """
+        return {
+            'success': False,
+            'error': '请求超时',
+            'http_code': 0,
+            'deadline_exceeded': True
+        }
+    
+    @staticmethod
+    def _circuit_open_result() -> Dict[str, Any]:
+        """
+        构建熔断快速失败结果
+        错误信息 'Circuit open' 在 error_mappings 中有对应的友好提示
+        
+        :return: 失败结果
+        """
+        return {
+            'success': False,
+            'error': 'Circuit open',
+            'http_code': 503,
+            'circuit_open': True
+        }
+    
+    @staticmethod
+    def _is_upstream_failure(result: Dict[str, Any]) -> bool:
+        """
+        判断结果是否说明上游不可用（网络错误、5xx、429），用于熔断统计
+        
+        :param result: 调用结果
+        :return: 是否为上游故障
+        """
+        http_code = result.get('http_code', 0)
+        return http_code == 0 or http_code == 429 or http_code >= 500
+    
+    @staticmethod
+    def _resend_reason(result: Dict[str, Any], idempotent: bool) -> Optional[str]:
+        """
+        判断失败的调用能否重发
+        
+        :param result: 调用结果
+        :param idempotent: 接口是否可以安全重复调用
+        :return: 'retry'（幂等接口）、'unsent_resend'（请求未到达上游）、
+                 'ambiguous'（请求可能已被处理，需要核对状态）或 None（不重试）
+        """
+        if result.get('success') or result.get('circuit_open') or result.get('deadline_exceeded'):
+            return None
+        http_code = result.get('http_code', 0)
+        if http_code != 0 and http_code not in RETRYABLE_STATUS_CODES:
+            return None
+        if idempotent:
+            return 'retry'
+        if result.get('request_sent') is False or http_code == 429:
+            return 'unsent_resend'
+        return 'ambiguous'
+    
+    def _retry_delay(self, endpoint: str, attempt: int, deadline: Deadline = None,
+                     reason: str = 'retry') -> Optional[float]:
+        """
+        计算下一次重试前的等待时间
+        
+        :param endpoint: 接口名
+        :param attempt: 已尝试次数
+        :param deadline: 可选，总时间预算
+        :param reason: 重试原因（计入指标）
+        :return: 等待秒数，None 表示放弃重试（次数、时间或重试预算用尽）
+        """
+        if attempt >= self.retry_policy.max_attempts:
+            return None
+        delay = self.retry_policy.backoff(attempt)
+        if deadline is not None and deadline.remaining() <= delay:
+            return None
+        if not self.retry_budget.try_spend():
+            UPSTREAM_RETRIES.inc(endpoint, 'budget_exhausted')
+            return None
+        UPSTREAM_RETRIES.inc(endpoint, reason)
+        return delay
+    
+    @staticmethod
+    def _recharge_applied(verify_result: Dict[str, Any]) -> Optional[bool]:
+        """
+        根据重新验证的卡密状态判断充值请求是否已生效
+        
+        :param verify_result: 验证结果
+        :return: True（卡密已使用，充值已生效）、False（仍未使用，可以重发）或 None（无法判断）
+        """
+        if not verify_result.get('success', False):
+            return None
+        code_status = verify_result.get('data', {}).get('code_status', '')
+        if code_status == 'used':
+            return True
+        if code_status == 'active':
+            return False
+        return None
+    
+    @staticmethod
+    def _reconciled_result(endpoint: str, attempts: int) -> Dict[str, Any]:
+        """
+        构建核对后确认已生效的结果
+        
+        :param endpoint: 接口名
+        :param attempts: 已尝试次数
+        :return: 成功结果
+        """
+        UPSTREAM_RETRIES.inc(endpoint, 'reconciled')
+        return {
+            'success': True,
+            'message': '充值成功',
+            'http_code': 200,
+            'reconciled': True,
+            'attempts': attempts
+        }
+    
+    @staticmethod
+    def _record_timing(endpoint: str, timing: Dict[str, float], result: Dict[str, Any] = None):
+        """
+        把一次上游调用的各阶段耗时计入直方图，并以毫秒附加到结果中
+        
+        :param endpoint: 接口名
+        :param timing: 阶段 -> 秒
+        :param result: 调用结果（可选）
+        """
+        for phase, seconds in timing.items():
+            UPSTREAM_PHASE_SECONDS.observe(seconds, endpoint, phase)
+        if result is not None:
+            result['timing'] = {phase: round(seconds * 1000, 2) for phase, seconds in timing.items()}
+    
+    @staticmethod
+    def _finish_step(step: Dict[str, Any], started: float) -> Dict[str, Any]:
+        """
+        记录流程步骤耗时
+        
+        :param step: 步骤结果
+        :param started: 步骤开始时间（perf_counter）
+        :return: 附加了 elapsed_ms 的步骤结果
+        """
+        elapsed = time.perf_counter() - started
+        step['elapsed_ms'] = round(elapsed * 1000, 2)
+        RECHARGE_STEP_SECONDS.observe(elapsed, step['step'], 'true' if step.get('success') else 'false')
+        return step
+    
+    @staticmethod
+    def _add_step(result: Dict[str, Any], step: Dict[str, Any]):
+        """
+        把步骤结果合并到完整流程结果中，充值/复用步骤同时作为最终结果
+        
+        :param result: 完整流程结果
+        :param step: 步骤结果
+        """
+        result['steps'].append(step)
+        if step['step'] in ('reuse_record', 'submit_recharge'):
+            result['final_result'] = step['result']
+            result['success'] = step['success']
+    
+    @staticmethod
+    def _next_action(verify_result: Dict[str, Any], user_data_json: Optional[str]) -> Optional[str]:
+        """
+        根据卡密状态决定下一步操作
+        
+        :param verify_result: 验证结果
+        :param user_data_json: 用户JSON Token
+        :return: 'reuse_record'、'submit_recharge' 或 None（无法继续）
+        """
+        code_status = verify_result.get('data', {}).get('code_status', '')
+        
+        if code_status == 'used':
+            # 已使用的卡密，尝试复用
+            return 'reuse_record'
+        if code_status == 'active' and user_data_json:
+            # 未使用的卡密，进行第一次充值
+            return 'submit_recharge'
+        return None
+    
+    def set_timeout(self, timeout: int):
+        """
+        设置请求超时时间（所有接口统一使用该读取超时）
+        
+        :param timeout: 超时时间（秒）
+        """
+        self.timeout = timeout
+        self.read_timeouts = {endpoint: float(timeout) for endpoint in self.read_timeouts}
+    
+    def set_connect_timeout(self, timeout: float):
+        """
+        设置建立连接的超时时间
+        
+        :param timeout: 超时时间（秒）
+        """
+        self.connect_timeout = timeout
+    
+    def set_read_timeout(self, endpoint: str, timeout: float):
+        """
+        设置单个接口的读取超时时间
+        
+        :param endpoint: 接口名，如 verify_activation_code
+        :param timeout: 超时时间（秒）
+        """
+        self.read_timeouts[endpoint] = timeout
+    
+    def set_recharge_deadline(self, deadline: float):
+        """
+        设置完整充值流程的总时间预算
+        
+        :param deadline: 总时间（秒）
+        """
+        self.recharge_deadline = deadline
+    
+    def set_max_response_bytes(self, max_bytes: int):
+        """
+        设置响应正文上限
+        
+        :param max_bytes: 最大字节数
+        """
+        self.max_response_bytes = max_bytes
+    
+    def set_user_agent(self, user_agent: str):
+        """
+        设置User-Agent
+        
+        :param user_agent: User-Agent字符串
+        """
+        self.user_agent = user_agent
+    
+    def set_session_bootstrap(self, mode: str):
+        """
+        设置获取Session的方式
+        
+        :param mode: head、stream 或 full
+        """
+        if mode not in SESSION_BOOTSTRAP_MODES:
+            raise ValueError(f'不支持的获取方式: {mode}')
+        self.session_bootstrap = mode
+    
+    def get_config(self) -> Dict[str, Any]:
+        """
+        获取当前配置信息
+        
+        :return: 配置信息
+        """
+        return {
+            'base_url': self.base_url,
+            'timeout': self.timeout,
+            'connect_timeout': self.connect_timeout,
+            'read_timeouts': dict(self.read_timeouts),
+            'recharge_deadline': self.recharge_deadline,
+            'max_response_bytes': self.max_response_bytes,
+            'retry_max_attempts': self.retry_policy.max_attempts,
+            'user_agent': self.user_agent,
+            'session_bootstrap': self.session_bootstrap
+        }
+
+
+class ChongzhiProApiClient(ApiClientBase):
+    def __init__(self, base_url: str = None, transport: PooledTransport = None):
+        """
+        构造函数
+        :param base_url: 可选，自定义基础URL
+        :param transport: 可选，自定义传输层（默认使用进程级共享连接池）
+        """
+        super().__init__(base_url)
+        
+        # 所有实例共享同一个连接池，跨请求复用TCP/TLS连接
+        # 共享传输层默认跳过SSL验证（对应PHP中的CURLOPT_SSL_VERIFYPEER => false）
+        self.transport = transport or get_shared_transport()
+        self.session = self.transport.session
+        
+    def get_session(self, deadline: Deadline = None) -> Optional[str]:
+        """
+        获取Session ID
+        访问主页获取 ios_gpt_session Cookie
+        
+        :param deadline: 可选，总时间预算
+        :return: Session ID 或 None（失败时，已按重试策略重试）
+        """
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            if deadline is not None and deadline.expired:
+                return None
+            breaker = get_breaker('get_session')
+            if not breaker.allow():
+                return None
+            
+            start = time.perf_counter()
+            with capture_phases() as timing:
+                session_id = self._fetch_session(self._timeouts('get_session', deadline))
+            timing['total'] = time.perf_counter() - start
+            breaker.record(session_id is not None, timing['total'])
+            self._record_timing('get_session', timing)
+            if session_id is not None:
+                return session_id
+            
+            # 获取Session没有副作用，可以直接重试
+            delay = self._retry_delay('get_session', attempt, deadline)
+            if delay is None:
+                return None
+            time.sleep(delay)
+            attempt += 1
+    
+    def _fetch_session(self, timeout: Tuple[float, float]) -> Optional[str]:
+        """按 session_bootstrap 指定的方式请求主页并提取Session ID"""
+        url, headers = self._session_request()
+        
+        try:
+            if self.session_bootstrap == 'full':
+                response = self.transport.get(url, headers=headers, timeout=timeout)
+                if response.status_code != 200:
+                    return None
+                session_bootstrap_stats.record('full', body_read=self._content_length(response) or len(response.content))
+                return self._extract_session_id(response.cookies, response.headers.get('Set-Cookie', ''))
+            
+            if self.session_bootstrap == 'head':
+                # HEAD 只返回响应头；部分服务器对HEAD不下发Cookie，此时回退到流式GET
+                response = self.transport.request('HEAD', url, headers=headers, timeout=timeout)
+                response.close()
+                if response.status_code == 200:
+                    session_id = self._extract_session_id(response.cookies, response.headers.get('Set-Cookie', ''))
+                    if session_id:
+                        session_bootstrap_stats.record('head', body_skipped=self._content_length(response))
+                        return session_id
+                session_bootstrap_stats.record_fallback()
+            
+            # 流式GET：从响应头取Cookie，较小的剩余正文读完后释放，使连接回到连接池
+            response = self.transport.get(url, headers=headers, timeout=timeout, stream=True)
+            try:
+                if response.status_code != 200:
+                    return None
+                session_id = self._extract_session_id(response.cookies, response.headers.get('Set-Cookie', ''))
+                body_read, body_skipped = self._drain_session_response(response)
+                session_bootstrap_stats.record('stream', body_skipped=body_skipped, body_read=body_read)
+                return session_id
+            finally:
+                response.close()
             
         except Exception as e:
             print(f"获取Session失败: {e}")
             return None
     
-    def verify_activation_code(self, session: str, activation_code: str) -> Dict[str, Any]:
+    def _drain_session_response(self, response: requests.Response) -> Tuple[int, Optional[int]]:
+        """
+        读完流式GET剩余的正文（不解码），关闭时连接回到连接池；未读完就关闭时 urllib3 会丢弃连接
+        正文超过 SESSION_DRAIN_MAX_BYTES 或读取出错时放弃，连接随关闭丢弃
+        
+        :param response: stream=True 的响应
+        :return: (读取的字节数, 跳过的字节数，None 表示无法确定)
+        """
+        length = self._content_length(response)
+        if length is not None and length > SESSION_DRAIN_MAX_BYTES:
+            return 0, length
+        drained = 0
+        try:
+            for chunk in response.raw.stream(BODY_CHUNK_SIZE, decode_content=False):
+                drained += len(chunk)
+                if drained > SESSION_DRAIN_MAX_BYTES:
+                    return drained, None
+        except Exception:
+            return drained, None
+        return drained, 0
+    
+    def verify_activation_code(self, session: str, activation_code: str, deadline: Deadline = None) -> Dict[str, Any]:
         """
         验证激活码
         
         :param session: Session ID
         :param activation_code: 激活码
+        :param deadline: 可选，总时间预算
         :return: 验证结果
         """
-        url = f"{self.base_url}/api-verify.php"
+        url, payload, headers = self._verify_request(session, activation_code)
         
-        payload = {
-            'activation_code': activation_code
-        }
+        return self._send_with_retry(url, payload, headers, 'verify_activation_code', deadline)
+    
+    def verify_many(self, activation_codes: Iterable[str], max_workers: int = 8,
+                    session_factory: Callable[[], Optional[str]] = None,
+                    deadline: Deadline = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        批量验证激活码
+        重复的激活码只验证一次；每个工作线程复用同一个Session，Session失效时重新获取一次
         
-        headers = {
-            'User-Agent': self.user_agent,
-            'Accept': 'application/json',
-            'Referer': f"{self.base_url}/",
-            'Content-Type': 'application/json',
-            'Origin': self.base_url,
-            'Host': urlparse(self.base_url).netloc,
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
-            'Cookie': f'ios_gpt_session={session}',
-        }
+        :param activation_codes: 激活码列表
+        :param max_workers: 最大并发数
+        :param session_factory: 可选，获取Session的函数（默认 get_session，可传入预热池的 acquire）
+        :param deadline: 可选，总时间预算
+        :return: 按完成顺序产出 (激活码, 验证结果)
+        """
+        session_factory = session_factory or self.get_session
+        codes = list(dict.fromkeys(activation_codes))
+        local = threading.local()
         
-        return self._send_request(url, 'POST', payload, headers)
+        def verify_one(code: str) -> Tuple[str, Dict[str, Any]]:
+            for _ in range(2):
+                session = getattr(local, 'session', None) or session_factory()
+                if not session:
+                    return code, self._failure_result('获取Session失败')
+                local.session = session
+                result = self.verify_activation_code(session, code, deadline=deadline)
+                if result.get('http_code') not in SESSION_REJECTED_HTTP_CODES:
+                    break
+                local.session = None
+            return code, result
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(codes))),
+                                      thread_name_prefix='verify-many')
+        try:
+            futures = [executor.submit(verify_one, code) for code in codes]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # 调用方提前停止迭代（如客户端断开）时取消尚未开始的验证
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    def reuse_record(self, session: str) -> Dict[str, Any]:
+    def reuse_record(self, session: str, deadline: Deadline = None) -> Dict[str, Any]:
         """
         复用充值记录
         
         :param session: Session ID
+        :param deadline: 可选，总时间预算
         :return: 复用结果
         """
-        url = f"{self.base_url}/api-recharge-reuse.php"
-        
-        payload = {
-            'action': 'reuse_record'
-        }
+        url, payload, headers = self._reuse_request(session)
         
-        headers = {
-            'User-Agent': self.user_agent,
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
-            'Content-Type': 'application/json',
-            'Referer': f"{self.base_url}/",
-            'Host': urlparse(self.base_url).netloc,
-            'Accept': '*/*',
-            'Origin': self.base_url,
-            'Cookie': f'ios_gpt_session={session}',
-        }
-        
-        return self._send_request(url, 'POST', payload, headers)
+        return self._send_with_retry(url, payload, headers, 'reuse_record', deadline, idempotent=False)
     
-    def submit_recharge(self, session: str, user_data_json: str) -> Dict[str, Any]:
+    def submit_recharge(self, session: str, user_data_json: str, deadline: Deadline = None,
+                        activation_code: str = None) -> Dict[str, Any]:
         """
         提交第一次充值
+        请求可能已被上游处理却没有拿到响应时，提供 activation_code 会先重新验证卡密：
+        已使用说明充值已生效，仍未使用才重发
         
         :param session: Session ID
         :param user_data_json: 用户JSON Token数据
+        :param deadline: 可选，总时间预算
+        :param activation_code: 可选，本次充值使用的激活码（用于核对状态）
         :return: 充值结果
         """
-        url = f"{self.base_url}/simple-submit-recharge.php"
-        
-        payload = {
-            'user_data': user_data_json
-        }
+        url, payload, headers = self._submit_request(session, user_data_json)
         
-        headers = {
-            'Origin': self.base_url,
-            'User-Agent': self.user_agent,
-            'Accept': 'application/json',
-            'Host': urlparse(self.base_url).netloc,
-            'Content-Type': 'application/json',
-            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
-            'Referer': f"{self.base_url}/",
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Cookie': f'ios_gpt_session={session}',
-        }
-        
-        return self._send_request(url, 'POST', payload, headers)
+        recheck = None
+        if activation_code:
+            recheck = lambda: self.verify_activation_code(session, activation_code, deadline=deadline)
+        return self._send_with_retry(url, payload, headers, 'submit_recharge', deadline,
+                                     idempotent=False, recheck=recheck)
     
-    def update_token_and_recharge(self, session: str, card_code: str, user_data_json: str) -> Dict[str, Any]:
+    def update_token_and_recharge(self, session: str, card_code: str, user_data_json: str, deadline: Deadline = None) -> Dict[str, Any]:
         """
         更新Token并充值
         
         :param session: Session ID
         :param card_code: 卡密
         :param user_data_json: 用户JSON Token数据
+        :param deadline: 可选，总时间预算
         :return: 充值结果
         """
-        url = f"{self.base_url}/api-recharge-reuse.php"
+        url, payload, headers = self._update_token_request(session, card_code, user_data_json)
         
-        payload = {
-            'action': 'update_token_and_recharge',
-            'card_code': card_code,
-            'json_data': user_data_json
-        }
+        # 更新前后卡密都是已使用状态，无法核对，只在请求确定未发出时重发
+        return self._send_with_retry(url, payload, headers, 'update_token_and_recharge', deadline, idempotent=False)
+    
+    def _send_with_retry(self, url: str, payload: Dict, headers: Dict, endpoint: str,
+                         deadline: Deadline = None, idempotent: bool = True,
+                         recheck: Callable[[], Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        发送POST请求，失败时按重试策略重发
+        非幂等接口只在请求确定未到达上游时重发；可能已被处理时调用 recheck 核对状态
         
-        headers = {
-            'User-Agent': self.user_agent,
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
-            'Content-Type': 'application/json',
-            'Referer': f"{self.base_url}/",
-            'Host': urlparse(self.base_url).netloc,
-            'Accept': '*/*',
-            'Origin': self.base_url,
-            'Cookie': f'ios_gpt_session={session}',
-        }
+        :param url: 请求URL
+        :param payload: 请求数据
+        :param headers: 请求头
+        :param endpoint: 接口名
+        :param deadline: 可选，总时间预算
+        :param idempotent: 接口是否可以安全重复调用
+        :param recheck: 可选，返回卡密验证结果的函数
+        :return: 响应结果（重试过时 attempts 字段为尝试次数）
+        """
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            result = self._send_request(url, 'POST', payload, headers, endpoint=endpoint, deadline=deadline)
+            reason = self._resend_reason(result, idempotent)
+            if reason == 'ambiguous':
+                applied = self._recharge_applied(recheck()) if recheck else None
+                if applied:
+                    return self._reconciled_result(endpoint, attempt)
+                reason = 'recheck_resend' if applied is False else None
+            
+            delay = self._retry_delay(endpoint, attempt, deadline, reason) if reason else None
+            if delay is None:
+                if attempt > 1:
+                    result['attempts'] = attempt
+                return result
+            time.sleep(delay)
+            attempt += 1
+    
+    def _read_body(self, response) -> bytes:
+        """
+        分块读取响应正文，超过 max_response_bytes 时停止
         
-        return self._send_request(url, 'POST', payload, headers)
+        :param response: 流式响应
+        :return: 响应正文
+        :raises ResponseTooLarge: 超过上限
+        """
+        self._check_declared_length(response)
+        body = bytearray()
+        for chunk in response.iter_content(BODY_CHUNK_SIZE):
+            body += chunk
+            if len(body) > self.max_response_bytes:
+                raise ResponseTooLarge(len(body))
+        return bytes(body)
     
-    def _send_request(self, url: str, method: str = 'GET', data: Dict = None, headers: Dict = None) -> Dict[str, Any]:
+    def _send_request(self, url: str, method: str = 'GET', data: Dict = None, headers: Dict = None,
+                      endpoint: str = None, deadline: Deadline = None) -> Dict[str, Any]:
         """
         发送HTTP请求
         
@@ -194,167 +992,183 @@ class ChongzhiProApiClient:
         :param method: 请求方法
         :param data: 请求数据
         :param headers: 请求头
-        :return: 响应结果
+        :param endpoint: 指标中使用的接口名（默认取URL路径）
+        :param deadline: 可选，总时间预算，用尽时不再发出请求
+        :return: 响应结果（timing 字段为各阶段耗时，毫秒）
         """
-        try:
-            if method.upper() == 'POST':
-                response = self.session.post(
-                    url, 
-                    json=data, 
-                    headers=headers, 
-                    timeout=self.timeout
-                )
-            else:
-                response = self.session.get(
-                    url, 
-                    headers=headers, 
-                    timeout=self.timeout
-                )
-            
-            # 检查HTTP状态码
-            if response.status_code not in [200, 201]:
-                return {
-                    'success': False,
-                    'error': f'HTTP错误: {response.status_code}',
-                    'http_code': response.status_code
-                }
-            
-            # 尝试解析JSON响应
+        endpoint = endpoint or urlparse(url).path
+        
+        # 总时间预算已用尽，不再发请求
+        if deadline is not None and deadline.expired:
+            return self._deadline_exceeded_result()
+        
+        # 上游熔断中，不发请求直接失败
+        breaker = get_breaker(endpoint)
+        if not breaker.allow():
+            return self._circuit_open_result()
+        
+        # (连接超时, 读取超时)，不超过总时间预算的剩余部分
+        timeout = self._timeouts(endpoint, deadline)
+        timing = {}
+        start = time.perf_counter()
+        
+        with capture_phases() as phases:
             try:
-                result = response.json()
-            except json.JSONDecodeError as e:
-                return {
-                    'success': False,
-                    'error': f'JSON解析失败: {str(e)}',
-                    'raw_response': response.text,
-                    'http_code': response.status_code
-                }
-            
-            # 添加HTTP状态码到结果中
-            result['http_code'] = response.status_code
-            return result
-            
-        except requests.exceptions.Timeout:
-            return {
-                'success': False,
-                'error': '请求超时',
-                'http_code': 0
-            }
-        except requests.exceptions.ConnectionError as e:
-            return {
-                'success': False,
-                'error': f'连接错误: {str(e)}',
-                'http_code': 0
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'请求失败: {str(e)}',
-                'http_code': 0
-            }
+                if method.upper() == 'POST':
+                    response = self.transport.post(
+                        url, 
+                        json=data, 
+                        headers=headers, 
+                        timeout=timeout,
+                        stream=True
+                    )
+                else:
+                    response = self.transport.get(
+                        url, 
+                        headers=headers, 
+                        timeout=timeout,
+                        stream=True
+                    )
+                
+                # 流式请求返回时响应头已到达，正文读取单独计时
+                headers_at = time.perf_counter()
+                try:
+                    body = self._read_body(response)
+                except ResponseTooLarge:
+                    body = None
+                    result = self._oversized_result(endpoint, response)
+                finally:
+                    response.close()
+                body_read_at = time.perf_counter()
+                
+                if body is not None:
+                    result = self._handle_response(response, body)
+                
+                timing['ttfb'] = max(0.0, headers_at - start - phases.get('connect', 0.0) - phases.get('tls', 0.0))
+                timing['body_read'] = body_read_at - headers_at
+                timing['json_decode'] = time.perf_counter() - body_read_at
+                
+            except requests.exceptions.ConnectTimeout:
+                result = self._failure_result('请求超时', request_sent=False)
+            except requests.exceptions.Timeout:
+                result = self._failure_result('请求超时')
+            except requests.exceptions.ConnectionError as e:
+                # 建立连接失败时请求一定没有发出
+                reason = getattr(e.args[0], 'reason', None) if e.args else None
+                result = self._failure_result(f'连接错误: {str(e)}',
+                                              request_sent=not isinstance(reason, NewConnectionError))
+            except Exception as e:
+                result = self._failure_result(f'请求失败: {str(e)}')
+        
+        timing.update(phases)
+        timing['total'] = time.perf_counter() - start
+        breaker.record(not self._is_upstream_failure(result), timing['total'])
+        self._record_timing(endpoint, timing, result)
+        return result
     
-    def full_recharge_process(self, activation_code: str, user_data_json: str = None) -> Dict[str, Any]:
+    def iter_recharge_process(self, activation_code: str, user_data_json: str = None,
+                              deadline: Deadline = None, session: str = None,
+                              verify_result: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
         """
-        完整的充值流程
-        自动执行：获取Session -> 验证卡密 -> 复用/充值
+        逐步执行完整充值流程，每完成一步立即产出该步骤结果
         
         :param activation_code: 激活码
         :param user_data_json: 用户JSON Token（可选，用于第一次充值）
-        :return: 完整流程结果
+        :param deadline: 可选，总时间预算（默认 recharge_deadline 秒），各步骤共享
+        :param session: 可选，预先获取的Session ID（如预热池中的），被上游拒绝时重新获取一次
+        :param verify_result: 可选，已用 session 完成的验证结果（如缓存的），提供时不再验证
+        :return: 步骤结果迭代器
         """
-        result = {
-            'success': False,
-            'steps': [],
-            'final_result': None
-        }
+        # 各步骤共享同一个时间预算，后面的步骤只能使用剩余时间
+        deadline = deadline or Deadline(self.recharge_deadline)
         
         # 步骤1：获取Session
-        session = self.get_session()
+        started = time.perf_counter()
+        pooled = session is not None
+        if not pooled:
+            session = self.get_session(deadline=deadline)
         if not session:
-            result['steps'].append({
+            yield self._finish_step({
                 'step': 'get_session', 
                 'success': False, 
                 'error': '获取Session失败'
-            })
-            return result
+            }, started)
+            return
         
-        result['steps'].append({
+        yield self._finish_step({
             'step': 'get_session', 
             'success': True, 
             'session': session
-        })
+        }, started)
         
         # 步骤2：验证激活码
-        verify_result = self.verify_activation_code(session, activation_code)
-        result['steps'].append({
+        started = time.perf_counter()
+        # 提供了验证结果时使用它，不再验证也不再更换Session（调用方已处理Session被拒绝的情况）
+        if verify_result is None:
+            verify_result = self.verify_activation_code(session, activation_code, deadline=deadline)
+            if pooled and verify_result.get('http_code') in SESSION_REJECTED_HTTP_CODES:
+                # 预先获取的Session已失效，重新获取后再验证一次
+                session = self.get_session(deadline=deadline)
+                if session:
+                    verify_result = self.verify_activation_code(session, activation_code, deadline=deadline)
+        yield self._finish_step({
             'step': 'verify_code', 
             'success': verify_result.get('success', False), 
             'result': verify_result
-        })
+        }, started)
         
         if not verify_result.get('success', False):
-            return result
+            return
         
         # 步骤3：根据卡密状态决定操作
-        code_status = verify_result.get('data', {}).get('code_status', '')
+        action = self._next_action(verify_result, user_data_json)
+        started = time.perf_counter()
         
-        if code_status == 'used':
+        if action == 'reuse_record':
             # 已使用的卡密，尝试复用
-            reuse_result = self.reuse_record(session)
-            result['steps'].append({
+            reuse_result = self.reuse_record(session, deadline=deadline)
+            yield self._finish_step({
                 'step': 'reuse_record', 
                 'success': reuse_result.get('success', False), 
                 'result': reuse_result
-            })
-            result['final_result'] = reuse_result
-            result['success'] = reuse_result.get('success', False)
-        elif code_status == 'active' and user_data_json:
+            }, started)
+        elif action == 'submit_recharge':
             # 未使用的卡密，进行第一次充值
-            recharge_result = self.submit_recharge(session, user_data_json)
-            result['steps'].append({
+            recharge_result = self.submit_recharge(session, user_data_json, deadline=deadline,
+                                                   activation_code=activation_code)
+            yield self._finish_step({
                 'step': 'submit_recharge', 
                 'success': recharge_result.get('success', False), 
                 'result': recharge_result
-            })
-            result['final_result'] = recharge_result
-            result['success'] = recharge_result.get('success', False)
+            }, started)
         else:
-            result['steps'].append({
+            yield self._finish_step({
                 'step': 'decision', 
                 'success': False, 
                 'error': '卡密状态异常或缺少用户数据'
-            })
-        
-        return result
+            }, started)
     
-    def set_timeout(self, timeout: int):
+    def full_recharge_process(self, activation_code: str, user_data_json: str = None,
+                              deadline: Deadline = None) -> Dict[str, Any]:
         """
-        设置请求超时时间
+        完整的充值流程
+        自动执行：获取Session -> 验证卡密 -> 复用/充值
         
-        :param timeout: 超时时间（秒）
-        """
-        self.timeout = timeout
-    
-    def set_user_agent(self, user_agent: str):
+        :param activation_code: 激活码
+        :param user_data_json: 用户JSON Token（可选，用于第一次充值）
+        :param deadline: 可选，总时间预算（默认 recharge_deadline 秒），各步骤共享
+        :return: 完整流程结果
         """
-        设置User-Agent
+        result = {
+            'success': False,
+            'steps': [],
+            'final_result': None
+        }
         
-        :param user_agent: User-Agent字符串
-        """
-        self.user_agent = user_agent
-    
-    def get_config(self) -> Dict[str, Any]:
-        """
-        获取当前配置信息
+        for step in self.iter_recharge_process(activation_code, user_data_json, deadline=deadline):
+            self._add_step(result, step)
         
-        :return: 配置信息
-        """
-        return {
-            'base_url': self.base_url,
-            'timeout': self.timeout,
-            'user_agent': self.user_agent
-        }
-
+        return result
 
 # 使用示例
 if __name__ == "__main__":
@@ -0,0 +1,505 @@
+"""
+ChongzhiPro 异步API客户端
+与 ChongzhiProApiClient 接口一致，所有方法为协程，返回完全相同的结果字典。
+基于 httpx.AsyncClient 连接池，适合在单进程内并发处理大量充值请求。
+
+使用示例：
+async with AsyncChongzhiProApiClient() as client:
+    session = await client.get_session()
+    result = await client.verify_activation_code(session, 'CARD-XXXX-XXXX-XXXX')
+# 事件循环结束前关闭共享连接池
+await close_shared_async_http_client()
+
+依赖：pip install httpx
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from http.cookiejar import CookieJar
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Any, Tuple
+
+try:
+    import httpx
+except ImportError:  # 可选依赖，仅异步客户端需要
+    httpx = None
+
+from api_client import (ApiClientBase, BODY_CHUNK_SIZE, SESSION_DRAIN_MAX_BYTES, SESSION_REJECTED_HTTP_CODES,
+                        ResponseTooLarge, session_bootstrap_stats)
+from resilience import Deadline, get_breaker
+from transport import _BlockAllCookies
+
+
+# 每个事件循环一个共享连接池（httpx.AsyncClient 不能跨事件循环使用）
+_shared_clients: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def _create_http_client(max_connections: int = None) -> 'httpx.AsyncClient':
+    """
+    创建异步连接池
+
+    :param max_connections: 最大连接数，默认读取 UPSTREAM_ASYNC_POOL_SIZE（100）
+    :return: httpx.AsyncClient
+    """
+    if httpx is None:
+        raise RuntimeError('异步客户端需要安装 httpx：pip install httpx')
+
+    if max_connections is None:
+        max_connections = int(os.environ.get('UPSTREAM_ASYNC_POOL_SIZE', '100'))
+
+    return httpx.AsyncClient(
+        verify=False,  # 与同步客户端一致，跳过SSL验证
+        # 与同步客户端一致，连接池不保存Cookie，否则获取Session时会带上其他用户的 ios_gpt_session
+        cookies=CookieJar(policy=_BlockAllCookies()),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=float(os.environ.get('UPSTREAM_MAX_IDLE_TIME', '60')),
+        ),
+    )
+
+
+def get_shared_async_http_client() -> 'httpx.AsyncClient':
+    """
+    获取当前事件循环共享的异步连接池
+
+    :return: httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _create_http_client()
+        _shared_clients[loop] = client
+    return client
+
+
+async def close_shared_async_http_client():
+    """关闭当前事件循环的共享连接池（事件循环结束前调用，如 asyncio.run 的主协程退出时）"""
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncChongzhiProApiClient(ApiClientBase):
+    def __init__(self, base_url: str = None, http_client: 'httpx.AsyncClient' = None):
+        """
+        构造函数
+        :param base_url: 可选，自定义基础URL
+        :param http_client: 可选，自定义 httpx.AsyncClient（由调用方负责关闭，默认使用当前事件循环的共享连接池）
+        """
+        super().__init__(base_url)
+
+        if httpx is None:
+            raise RuntimeError('异步客户端需要安装 httpx：pip install httpx')
+
+        self._http_client = http_client
+
+    @property
+    def http_client(self) -> 'httpx.AsyncClient':
+        """当前使用的连接池"""
+        if self._http_client is None:
+            return get_shared_async_http_client()
+        return self._http_client
+
+    def _http_timeout(self, endpoint: str, deadline: Deadline = None) -> 'httpx.Timeout':
+        """
+        把连接/读取超时转换为 httpx.Timeout
+
+        :param endpoint: 接口名
+        :param deadline: 可选，总时间预算
+        :return: httpx.Timeout
+        """
+        connect_timeout, read_timeout = self._timeouts(endpoint, deadline)
+        return httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout)
+
+    async def get_session(self, deadline: Deadline = None) -> Optional[str]:
+        """
+        获取Session ID
+        访问主页获取 ios_gpt_session Cookie
+
+        :param deadline: 可选，总时间预算
+        :return: Session ID 或 None（失败时，已按重试策略重试）
+        """
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            if deadline is not None and deadline.expired:
+                return None
+            breaker = get_breaker('get_session')
+            if not breaker.allow():
+                return None
+
+            start = time.perf_counter()
+            try:
+                session_id = await self._fetch_session(self._http_timeout('get_session', deadline))
+            except BaseException:
+                # 被取消（客户端断开、wait_for 超时）时归还半开状态的试探名额，否则熔断器永远不会恢复
+                breaker.cancel()
+                raise
+            elapsed = time.perf_counter() - start
+            breaker.record(session_id is not None, elapsed)
+            self._record_timing('get_session', {'total': elapsed})
+            if session_id is not None:
+                return session_id
+
+            # 获取Session没有副作用，可以直接重试
+            delay = self._retry_delay('get_session', attempt, deadline)
+            if delay is None:
+                return None
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _fetch_session(self, timeout: 'httpx.Timeout') -> Optional[str]:
+        """按 session_bootstrap 指定的方式请求主页并提取Session ID"""
+        url, headers = self._session_request()
+        client = self.http_client
+
+        try:
+            if self.session_bootstrap == 'full':
+                response = await client.get(url, headers=headers, timeout=timeout)
+                if response.status_code != 200:
+                    return None
+                session_bootstrap_stats.record('full', body_read=self._content_length(response) or len(response.content))
+                return self._extract_session_id(response.cookies, response.headers.get('Set-Cookie', ''))
+
+            if self.session_bootstrap == 'head':
+                # HEAD 只返回响应头；部分服务器对HEAD不下发Cookie，此时回退到流式GET
+                response = await client.head(url, headers=headers, timeout=timeout)
+                if response.status_code == 200:
+                    session_id = self._extract_session_id(response.cookies, response.headers.get('Set-Cookie', ''))
+                    if session_id:
+                        session_bootstrap_stats.record('head', body_skipped=self._content_length(response))
+                        return session_id
+                session_bootstrap_stats.record_fallback()
+
+            # 流式GET：从响应头取Cookie，较小的剩余正文读完后释放，使连接回到连接池
+            async with client.stream('GET', url, headers=headers, timeout=timeout) as response:
+                if response.status_code != 200:
+                    return None
+                session_id = self._extract_session_id(response.cookies, response.headers.get('Set-Cookie', ''))
+                body_read, body_skipped = await self._drain_session_response(response)
+                session_bootstrap_stats.record('stream', body_skipped=body_skipped, body_read=body_read)
+                return session_id
+
+        except Exception as e:
+            print(f"获取Session失败: {e}")
+            return None
+
+    async def _drain_session_response(self, response: 'httpx.Response') -> Tuple[int, Optional[int]]:
+        """
+        读完流式GET剩余的正文（不解码），关闭时连接回到连接池；未读完就关闭时 httpx 会丢弃连接
+        正文超过 SESSION_DRAIN_MAX_BYTES 或读取出错时放弃，连接随关闭丢弃
+
+        :param response: client.stream() 的响应
+        :return: (读取的字节数, 跳过的字节数，None 表示无法确定)
+        """
+        length = self._content_length(response)
+        if length is not None and length > SESSION_DRAIN_MAX_BYTES:
+            return 0, length
+        drained = 0
+        try:
+            async for chunk in response.aiter_raw(BODY_CHUNK_SIZE):
+                drained += len(chunk)
+                if drained > SESSION_DRAIN_MAX_BYTES:
+                    return drained, None
+        except httpx.HTTPError:
+            return drained, None
+        return drained, 0
+
+    async def verify_activation_code(self, session: str, activation_code: str, deadline: Deadline = None) -> Dict[str, Any]:
+        """
+        验证激活码
+
+        :param session: Session ID
+        :param activation_code: 激活码
+        :param deadline: 可选，总时间预算
+        :return: 验证结果
+        """
+        url, payload, headers = self._verify_request(session, activation_code)
+
+        return await self._send_with_retry(url, payload, headers, 'verify_activation_code', deadline)
+
+    async def reuse_record(self, session: str, deadline: Deadline = None) -> Dict[str, Any]:
+        """
+        复用充值记录
+
+        :param session: Session ID
+        :param deadline: 可选，总时间预算
+        :return: 复用结果
+        """
+        url, payload, headers = self._reuse_request(session)
+
+        return await self._send_with_retry(url, payload, headers, 'reuse_record', deadline, idempotent=False)
+
+    async def submit_recharge(self, session: str, user_data_json: str, deadline: Deadline = None,
+                              activation_code: str = None) -> Dict[str, Any]:
+        """
+        提交第一次充值
+        请求可能已被上游处理却没有拿到响应时，提供 activation_code 会先重新验证卡密：
+        已使用说明充值已生效，仍未使用才重发
+
+        :param session: Session ID
+        :param user_data_json: 用户JSON Token数据
+        :param deadline: 可选，总时间预算
+        :param activation_code: 可选，本次充值使用的激活码（用于核对状态）
+        :return: 充值结果
+        """
+        url, payload, headers = self._submit_request(session, user_data_json)
+
+        recheck = None
+        if activation_code:
+            recheck = lambda: self.verify_activation_code(session, activation_code, deadline=deadline)
+        return await self._send_with_retry(url, payload, headers, 'submit_recharge', deadline,
+                                           idempotent=False, recheck=recheck)
+
+    async def update_token_and_recharge(self, session: str, card_code: str, user_data_json: str, deadline: Deadline = None) -> Dict[str, Any]:
+        """
+        更新Token并充值
+
+        :param session: Session ID
+        :param card_code: 卡密
+        :param user_data_json: 用户JSON Token数据
+        :param deadline: 可选，总时间预算
+        :return: 充值结果
+        """
+        url, payload, headers = self._update_token_request(session, card_code, user_data_json)
+
+        # 更新前后卡密都是已使用状态，无法核对，只在请求确定未发出时重发
+        return await self._send_with_retry(url, payload, headers, 'update_token_and_recharge', deadline, idempotent=False)
+
+    async def _send_with_retry(self, url: str, payload: Dict, headers: Dict, endpoint: str,
+                               deadline: Deadline = None, idempotent: bool = True,
+                               recheck: Callable[[], Awaitable[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        发送POST请求，失败时按重试策略重发
+        非幂等接口只在请求确定未到达上游时重发；可能已被处理时调用 recheck 核对状态
+
+        :param url: 请求URL
+        :param payload: 请求数据
+        :param headers: 请求头
+        :param endpoint: 接口名
+        :param deadline: 可选，总时间预算
+        :param idempotent: 接口是否可以安全重复调用
+        :param recheck: 可选，返回卡密验证结果的协程函数
+        :return: 响应结果（重试过时 attempts 字段为尝试次数）
+        """
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            result = await self._send_request(url, 'POST', payload, headers, endpoint=endpoint, deadline=deadline)
+            reason = self._resend_reason(result, idempotent)
+            if reason == 'ambiguous':
+                applied = self._recharge_applied(await recheck()) if recheck else None
+                if applied:
+                    return self._reconciled_result(endpoint, attempt)
+                reason = 'recheck_resend' if applied is False else None
+
+            delay = self._retry_delay(endpoint, attempt, deadline, reason) if reason else None
+            if delay is None:
+                if attempt > 1:
+                    result['attempts'] = attempt
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _read_body(self, response: 'httpx.Response') -> bytes:
+        """
+        分块读取响应正文，超过 max_response_bytes 时停止
+
+        :param response: 流式响应
+        :return: 响应正文
+        :raises ResponseTooLarge: 超过上限
+        """
+        self._check_declared_length(response)
+        body = bytearray()
+        async for chunk in response.aiter_bytes(BODY_CHUNK_SIZE):
+            body += chunk
+            if len(body) > self.max_response_bytes:
+                raise ResponseTooLarge(len(body))
+        return bytes(body)
+
+    async def _send_request(self, url: str, method: str = 'GET', data: Dict = None, headers: Dict = None,
+                            endpoint: str = None, deadline: Deadline = None) -> Dict[str, Any]:
+        """
+        发送HTTP请求
+
+        :param url: 请求URL
+        :param method: 请求方法
+        :param data: 请求数据
+        :param headers: 请求头
+        :param endpoint: 指标中使用的接口名（默认取URL路径）
+        :param deadline: 可选，总时间预算，用尽时不再发出请求
+        :return: 响应结果（timing 字段为各阶段耗时，毫秒）
+        """
+        endpoint = endpoint or httpx.URL(url).path
+
+        # 总时间预算已用尽，不再发请求
+        if deadline is not None and deadline.expired:
+            return self._deadline_exceeded_result()
+
+        # 上游熔断中，不发请求直接失败
+        breaker = get_breaker(endpoint)
+        if not breaker.allow():
+            return self._circuit_open_result()
+
+        # (连接超时, 读取超时)，不超过总时间预算的剩余部分
+        timeout = self._http_timeout(endpoint, deadline)
+        timing = {}
+        start = time.perf_counter()
+
+        is_post = method.upper() == 'POST'
+        try:
+            async with self.http_client.stream(
+                'POST' if is_post else 'GET',
+                url,
+                json=data if is_post else None,
+                headers=headers,
+                timeout=timeout
+            ) as response:
+                # httpx 不提供建连与首字节耗时，只记录正文读取、解析和总耗时
+                headers_at = time.perf_counter()
+                try:
+                    body = await self._read_body(response)
+                except ResponseTooLarge:
+                    body = None
+                    result = self._oversized_result(endpoint, response)
+                decode_start = time.perf_counter()
+                timing['body_read'] = decode_start - headers_at
+
+            if body is not None:
+                result = self._handle_response(response, body)
+                timing['json_decode'] = time.perf_counter() - decode_start
+
+        except (httpx.ConnectTimeout, httpx.PoolTimeout):
+            result = self._failure_result('请求超时', request_sent=False)
+        except httpx.TimeoutException:
+            result = self._failure_result('请求超时')
+        except httpx.ConnectError as e:
+            # 建立连接失败时请求一定没有发出
+            result = self._failure_result(f'连接错误: {str(e)}', request_sent=False)
+        except httpx.NetworkError as e:
+            result = self._failure_result(f'连接错误: {str(e)}')
+        except Exception as e:
+            result = self._failure_result(f'请求失败: {str(e)}')
+        except BaseException:
+            # 被取消（客户端断开、wait_for 超时）时归还半开状态的试探名额，否则熔断器永远不会恢复
+            breaker.cancel()
+            raise
+
+        timing['total'] = time.perf_counter() - start
+        breaker.record(not self._is_upstream_failure(result), timing['total'])
+        self._record_timing(endpoint, timing, result)
+        return result
+
+    async def iter_recharge_process(self, activation_code: str, user_data_json: str = None,
+                                    deadline: Deadline = None, session: str = None,
+                                    verify_result: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        逐步执行完整充值流程，每完成一步立即产出该步骤结果
+
+        :param activation_code: 激活码
+        :param user_data_json: 用户JSON Token（可选，用于第一次充值）
+        :param deadline: 可选，总时间预算（默认 recharge_deadline 秒），各步骤共享
+        :param session: 可选，预先获取的Session ID，被上游拒绝时重新获取一次
+        :param verify_result: 可选，已用 session 完成的验证结果，提供时不再验证
+        :return: 步骤结果异步迭代器
+        """
+        # 各步骤共享同一个时间预算，后面的步骤只能使用剩余时间
+        deadline = deadline or Deadline(self.recharge_deadline)
+
+        # 步骤1：获取Session
+        started = time.perf_counter()
+        pooled = session is not None
+        if not pooled:
+            session = await self.get_session(deadline=deadline)
+        if not session:
+            yield self._finish_step({
+                'step': 'get_session',
+                'success': False,
+                'error': '获取Session失败'
+            }, started)
+            return
+
+        yield self._finish_step({
+            'step': 'get_session',
+            'success': True,
+            'session': session
+        }, started)
+
+        # 步骤2：验证激活码
+        started = time.perf_counter()
+        # 提供了验证结果时使用它，不再验证也不再更换Session（调用方已处理Session被拒绝的情况）
+        if verify_result is None:
+            verify_result = await self.verify_activation_code(session, activation_code, deadline=deadline)
+            if pooled and verify_result.get('http_code') in SESSION_REJECTED_HTTP_CODES:
+                # 预先获取的Session已失效，重新获取后再验证一次
+                session = await self.get_session(deadline=deadline)
+                if session:
+                    verify_result = await self.verify_activation_code(session, activation_code, deadline=deadline)
+        yield self._finish_step({
+            'step': 'verify_code',
+            'success': verify_result.get('success', False),
+            'result': verify_result
+        }, started)
+
+        if not verify_result.get('success', False):
+            return
+
+        # 步骤3：根据卡密状态决定操作
+        action = self._next_action(verify_result, user_data_json)
+        started = time.perf_counter()
+
+        if action == 'reuse_record':
+            final_result = await self.reuse_record(session, deadline=deadline)
+        elif action == 'submit_recharge':
+            final_result = await self.submit_recharge(session, user_data_json, deadline=deadline,
+                                                      activation_code=activation_code)
+        else:
+            yield self._finish_step({
+                'step': 'decision',
+                'success': False,
+                'error': '卡密状态异常或缺少用户数据'
+            }, started)
+            return
+
+        yield self._finish_step({
+            'step': action,
+            'success': final_result.get('success', False),
+            'result': final_result
+        }, started)
+
+    async def full_recharge_process(self, activation_code: str, user_data_json: str = None,
+                                    deadline: Deadline = None) -> Dict[str, Any]:
+        """
+        完整的充值流程
+        自动执行：获取Session -> 验证卡密 -> 复用/充值
+
+        :param activation_code: 激活码
+        :param user_data_json: 用户JSON Token（可选，用于第一次充值）
+        :param deadline: 可选，总时间预算（默认 recharge_deadline 秒），各步骤共享
+        :return: 完整流程结果
+        """
+        result = {
+            'success': False,
+            'steps': [],
+            'final_result': None
+        }
+
+        async for step in self.iter_recharge_process(activation_code, user_data_json, deadline=deadline):
+            self._add_step(result, step)
+
+        return result
+
+    async def aclose(self):
+        """
+        释放客户端
+        客户端本身不创建连接池：传入的 http_client 由调用方关闭，
+        共享连接池由 close_shared_async_http_client 关闭
+        """
+
+    async def __aenter__(self) -> 'AsyncChongzhiProApiClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
@@ -0,0 +1,158 @@
+"""
+响应压缩与静态页面缓存
+- 主页只渲染一次，预先生成 gzip / brotli 版本，带强 ETag 和 Cache-Control，条件请求返回 304
+- JSON 响应超过阈值时按 Accept-Encoding 即时压缩
+
+配置（环境变量）：
+INDEX_CACHE_MAX_AGE  主页 Cache-Control 的 max-age 秒数，默认 60
+COMPRESS_MIN_BYTES   JSON 响应压缩阈值（字节），默认 1024，0 表示不压缩
+COMPRESS_LEVEL       JSON 即时压缩的 gzip 级别，默认 5
+
+brotli 为可选依赖（pip install brotli），未安装时只提供 gzip。
+"""
+
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional
+
+from flask import Request, Response, request as current_request
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+# 服务端偏好顺序，客户端权重相同时优先使用靠前的编码
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(request: Request) -> Optional[str]:
+    """
+    根据 Accept-Encoding 选择压缩编码
+
+    :param request: 当前请求
+    :return: br、gzip，或 None（不压缩）
+    """
+    return request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+
+def compress(body: bytes, encoding: str, level: int = 9) -> bytes:
+    """
+    压缩响应正文
+
+    :param body: 原始正文
+    :param encoding: br 或 gzip
+    :param level: gzip 压缩级别（brotli 按比例换算）
+    :return: 压缩后的正文
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=min(11, round(level * 11 / 9)))
+    # mtime 固定为 0，相同内容的压缩结果完全一致
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class PrecompressedPage:
+    def __init__(self, body: bytes, mimetype: str = 'text/html', max_age: int = 60):
+        """
+        构造函数
+        :param body: 渲染好的页面
+        :param mimetype: 内容类型
+        :param max_age: Cache-Control 的 max-age（秒）
+        """
+        self.mimetype = mimetype
+        self.cache_control = f'public, max-age={max_age}'
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # 编码 -> (正文, ETag)；不同编码的表示各自使用不同的强 ETag
+        self._variants: Dict[Optional[str], tuple] = {None: (body, f'"{digest}"')}
+        for encoding in SUPPORTED_ENCODINGS:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                self._variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+
+    def sizes(self) -> Dict[str, int]:
+        """各编码版本的字节数"""
+        return {encoding or 'identity': len(body) for encoding, (body, _) in self._variants.items()}
+
+    def response(self, request: Request) -> Response:
+        """
+        按请求的 Accept-Encoding 和 If-None-Match 构建响应
+
+        :param request: 当前请求
+        :return: 200 或 304 响应
+        """
+        encoding = choose_encoding(request)
+        if encoding not in self._variants:
+            encoding = None
+        body, etag = self._variants[encoding]
+
+        headers = {
+            'ETag': etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        # If-None-Match 使用弱比较（忽略 W/ 前缀），只与本次选中编码版本的 ETag 比较：
+        # 304 携带的 ETag 必须对应客户端缓存中的那个表示
+        tags = _parse_etags(request.headers.get('If-None-Match', ''))
+        if '*' in tags or etag in tags:
+            return Response(status=304, headers=headers)
+
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return Response(body, mimetype=self.mimetype, headers=headers)
+
+
+def _parse_etags(header: str) -> set:
+    """解析 If-None-Match（去掉 W/ 前缀）"""
+    tags = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class JsonCompressor:
+    def __init__(self, min_bytes: int = 1024, level: int = 5):
+        """
+        构造函数
+        :param min_bytes: 正文达到此大小才压缩，0 表示关闭
+        :param level: gzip 压缩级别
+        """
+        self.min_bytes = min_bytes
+        self.level = level
+
+    def __call__(self, response: Response) -> Response:
+        """
+        after_request 钩子：压缩足够大的 JSON 响应
+
+        :param response: 响应
+        :return: 响应（可能已压缩）
+        """
+        if (not self.min_bytes
+                or response.mimetype != 'application/json'
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not 200 <= response.status_code < 300):
+            return response
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < self.min_bytes:
+            return response
+        encoding = choose_encoding(current_request)
+        if encoding is None:
+            return response
+        response.set_data(compress(body, encoding, self.level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def create_json_compressor_from_env() -> JsonCompressor:
+    """根据环境变量创建 JSON 响应压缩钩子"""
+    return JsonCompressor(
+        min_bytes=int(os.environ.get('COMPRESS_MIN_BYTES', '1024')),
+        level=int(os.environ.get('COMPRESS_LEVEL', '5')),
+    )
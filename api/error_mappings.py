@@ -3,6 +3,9 @@ API错误信息映射配置
 将技术性错误转换为用户友好的提示信息
 """
 
+from collections import deque
+from functools import lru_cache
+
 ERROR_MAPPINGS = {
     # RevenueCat API 错误映射
     'revenucat': {
@@ -82,6 +85,10 @@ ERROR_MAPPINGS = {
         'Bad Gateway': 'OpenAI服务网关错误，请稍后重试',
         'Gateway Timeout': 'OpenAI服务网关超时，请稍后重试',
         
+        # 本服务的保护性拒绝（熔断、限流）
+        'Circuit open': '充值服务暂时繁忙，请稍等一分钟后重试，不要换卡密',
+        'Server busy': '当前充值人数较多，请稍后重试',
+        
         # HTTP状态码错误
         '0': '提示可能已经充值成功了，请刷新GPT网页，如未成功请更新token，如多次不行有问题请找客服',
         '400': 'OpenAI请求参数错误，请检查提交的数据',
@@ -104,9 +111,138 @@ ERROR_MAPPINGS = {
 }
 
 
+# 上游表示激活码本身无效（不存在、输错、已作废）的错误关键词
+# 这类结果短时间内不会变化，可以负缓存；限流、"请重试"、会话失效等其他拒绝都可能很快恢复
+INVALID_CODE_KEYWORDS = [
+    '卡密不存在',
+    '激活码不存在',
+    '卡密无效',
+    '激活码无效',
+    '无效的卡密',
+    '无效的激活码',
+    '卡密错误',
+    '激活码错误',
+    '卡密已作废',
+    '激活码已作废',
+    'invalid activation code',
+    'invalid code',
+    'code not found',
+    'code does not exist',
+]
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器（Aho-Corasick 自动机）
+    对原始信息只扫描一遍即可找出所有命中的关键词，
+    多个关键词同时命中时返回在映射表中排在最前的一个，与逐个检查的结果一致
+    """
+
+    def __init__(self, keywords):
+        """
+        构造函数
+        :param keywords: 关键词列表（已转小写），顺序即优先级
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        # 每个状态可命中的最高优先级（最小下标），-1 表示无
+        self._best = [-1]
+
+        for index, keyword in enumerate(keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(-1)
+                state = next_state
+            if self._best[state] == -1:
+                self._best[state] = index
+
+        # 广度优先构建失败指针，并把后缀状态的命中结果合并进来
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                inherited = self._best[fail]
+                if inherited != -1 and (self._best[next_state] == -1 or inherited < self._best[next_state]):
+                    self._best[next_state] = inherited
+
+    def search(self, text: str) -> int:
+        """
+        查找命中的最高优先级关键词
+
+        :param text: 待匹配文本（已转小写）
+        :return: 关键词下标，未命中返回 -1
+        """
+        goto = self._goto
+        fail = self._fail
+        best_of = self._best
+        best = -1
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = best_of[state]
+            if found != -1 and (best == -1 or found < best):
+                if found == 0:
+                    return 0
+                best = found
+        return best
+
+
+# 每个服务预编译的 (匹配器, 友好提示列表)
+_MATCHERS = {}
+
+
+def rebuild_error_matchers():
+    """
+    根据 ERROR_MAPPINGS 重新编译匹配器
+    运行时修改映射表后需要调用
+    """
+    _MATCHERS.clear()
+    for service, mappings in ERROR_MAPPINGS.items():
+        _MATCHERS[service] = (
+            KeywordMatcher([key.lower() for key in mappings]),
+            list(mappings.values()),
+        )
+    _translate.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def _translate(error_message: str, service: str) -> str:
+    mappings = ERROR_MAPPINGS[service]
+
+    # 精确匹配
+    if error_message in mappings:
+        return mappings[error_message]
+
+    # 模糊匹配（包含关键词）
+    matcher, messages = _MATCHERS[service]
+    index = matcher.search(error_message.lower())
+    if index != -1:
+        return messages[index]
+
+    # 如果没有匹配到，返回原始错误信息
+    return error_message
+
+
 def get_friendly_error_message(error_message: str, service: str = 'openai') -> str:
     """
     根据错误信息获取用户友好的提示信息
+    上游故障期间同一错误会反复出现，最近的翻译结果会被缓存
     
     :param error_message: 原始错误信息
     :param service: 服务类型 (openai, revenuechat)
@@ -115,19 +251,7 @@ def get_friendly_error_message(error_message: str, service: str = 'openai') -> s
     if service not in ERROR_MAPPINGS:
         return error_message
     
-    mappings = ERROR_MAPPINGS[service]
-    
-    # 精确匹配
-    if error_message in mappings:
-        return mappings[error_message]
-    
-    # 模糊匹配（包含关键词）
-    for key, value in mappings.items():
-        if key.lower() in error_message.lower():
-            return value
-    
-    # 如果没有匹配到，返回原始错误信息
-    return error_message
+    return _translate(error_message, service)
 
 
 def map_http_status_error(status_code: int, service: str = 'openai') -> str:
@@ -156,4 +280,17 @@ def map_http_status_error(status_code: int, service: str = 'openai') -> str:
         return f'HTTP错误: {status_code}'
 
 
+def is_invalid_code_error(error_message: str) -> bool:
+    """
+    判断上游错误信息是否表示激活码本身无效
+
+    :param error_message: 上游返回的错误信息
+    :return: 是否命中 INVALID_CODE_KEYWORDS
+    """
+    if not error_message:
+        return False
+    return _INVALID_CODE_MATCHER.search(error_message.lower()) != -1
+
 
+_INVALID_CODE_MATCHER = KeywordMatcher([keyword.lower() for keyword in INVALID_CODE_KEYWORDS])
+rebuild_error_matchers()
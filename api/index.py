@@ -3,49 +3,176 @@ GPT充值系统 - Vercel部署版本
 优化的Flask应用，适配Vercel Serverless Functions
 """
 
-from flask import Flask, render_template, request, jsonify, session
-import re
-import json
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+import csv
+import hmac
+import io
 import os
 import sys
-from typing import Dict, Any
+from typing import Callable, Dict, Any
 import logging
 from datetime import datetime
+from functools import wraps
 
 # 导入同目录下的模块
-from api_client import ChongzhiProApiClient
+from activation_code import normalize_activation_code, parse_activation_code, parse_activation_codes
+from compression import PrecompressedPage, create_json_compressor_from_env
 from error_mappings import get_friendly_error_message
+import json_codec
+from lazy import deferred, lazy_module
+from log_queue import logging_stats, setup_logging_from_env
+from metrics import registry as metrics_registry
+from resilience import Deadline, breaker_stats, create_limiter_from_env, get_retry_budget
+from session_store import create_session_interface
+from single_flight import SingleFlight
+from token_inspect import inspect_json_token
+from verify_cache import create_verify_cache_from_env
+
+# 依赖 requests、asyncio、sqlite3 的模块，开启延迟初始化（LAZY_INIT）时在第一次使用时才导入
+api_client = lazy_module('api_client')
+jobs = lazy_module('jobs')
+transport = lazy_module('transport')
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON 提供者
+    jsonify 和 request.get_json 使用 json_codec，输出不转义非ASCII字符；
+    设置 ensure_ascii = True 时（orjson 不支持转义）以及调试模式下的缩进输出仍由标准库完成
+    """
+
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if 'indent' in kwargs or kwargs.get('ensure_ascii', self.ensure_ascii):
+            return super().dumps(obj, **kwargs)
+        return json_codec.dumps(obj, default=kwargs.get('default', self.default), sort_keys=kwargs.get('sort_keys', self.sort_keys))
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return json_codec.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if args and kwargs:
+            raise TypeError('app.json.response() takes either args or kwargs, not both')
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = self.dumps(obj, indent=2) + '\n'
+        elif self.ensure_ascii:
+            body = self.dumps(obj, separators=(',', ':')) + '\n'
+        else:
+            body = json_codec.dumps_bytes(obj, self.default, self.sort_keys) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 
 # 创建Flask应用
 app = Flask(__name__, 
            template_folder='../templates',
            static_folder='../static')
+app.json = CodecJSONProvider(app)
 
 # 配置
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 app.config['SESSION_TIMEOUT'] = int(os.environ.get('SESSION_TIMEOUT', '1800'))
+# 验证激活码接口的总时间预算（含会话被拒后的重试）
+app.config['VERIFY_DEADLINE'] = float(os.environ.get('VERIFY_DEADLINE', '15'))
+# 批量验证接口（客服使用），未设置 ADMIN_TOKEN 时关闭
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN', '')
+app.config['VERIFY_BATCH_MAX'] = int(os.environ.get('VERIFY_BATCH_MAX', '500'))
+app.config['VERIFY_BATCH_CONCURRENCY'] = int(os.environ.get('VERIFY_BATCH_CONCURRENCY', '8'))
+# /api/metrics 默认需要 X-Admin-Token；抓取端无法携带请求头时可设为 1 公开
+app.config['METRICS_PUBLIC'] = os.environ.get('METRICS_PUBLIC', '0') == '1'
 
-# Vercel环境只使用控制台日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
+# 服务端会话：Cookie 只携带会话ID（默认仍使用Flask签名Cookie）
+_session_interface = create_session_interface(
+    os.environ.get('SESSION_BACKEND', 'cookie'),
+    app.config['SESSION_TIMEOUT']
 )
+if _session_interface is not None:
+    app.session_interface = _session_interface
+
+# Vercel环境只使用控制台日志，经后台线程写出，不阻塞请求
+setup_logging_from_env()
 logger = logging.getLogger(__name__)
 
+# 上游Session预热池，验证激活码时直接取用
+session_pool = deferred(lambda: lazy_module('session_pool').create_session_pool_from_env())
+
+# 访问上游的并发上限，超出的请求直接返回503
+upstream_limiter = create_limiter_from_env()
+
+
+def lazy_stats(target: Any, stats: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    读取延迟初始化组件的统计信息；尚未加载时返回 not initialized，不为了统计而加载
+
+    :param target: lazy_module / deferred 返回的模块或对象
+    :param stats: 返回统计字典的函数
+    :return: 统计信息
+    """
+    if not getattr(target, 'loaded', True):
+        return {'status': 'not initialized'}
+    return stats()
 
-def validate_activation_code(code: str) -> bool:
-    """验证激活码格式"""
-    # 允许可选前缀（例如 CARD- 或其他），并允许 3 段或 4 段，每段 4 位字母或数字
-    # 示例可通过：QWER-XDKO-DWJN-R21Q、CARD-QWER-XDKO-DWJN、VIP-ABCD-EF12-3456
-    pattern = r'^(?:[A-Z]+-)?[A-Z0-9]{4}(?:-[A-Z0-9]{4}){2,3}$'
-    return bool(re.match(pattern, code, re.IGNORECASE))
+
+def upstream_pool_stats() -> Dict[str, Any]:
+    """上游连接池统计"""
+    return lazy_stats(transport, lambda: transport.get_shared_transport().stats())
+
+
+def session_pool_stats() -> Dict[str, Any]:
+    """Session预热池统计"""
+    return lazy_stats(session_pool, lambda: session_pool.stats())
+
+
+def session_bootstrap_stats() -> Dict[str, Any]:
+    """获取上游Session的流量统计"""
+    return lazy_stats(api_client, lambda: api_client.session_bootstrap_stats.snapshot())
+
+
+# 各组件的统计信息以 gauge 形式出现在 /api/metrics
+metrics_registry.register_stats('chongzhi_upstream_pool', 'Upstream connection pool stats',
+                                upstream_pool_stats)
+metrics_registry.register_stats('chongzhi_session_pool', 'Pre-warmed upstream session pool stats',
+                                session_pool_stats)
+metrics_registry.register_stats('chongzhi_session_bootstrap', 'Upstream session bootstrap traffic',
+                                session_bootstrap_stats)
+metrics_registry.register_stats('chongzhi_circuit', 'Upstream circuit breaker state by endpoint',
+                                breaker_stats)
+metrics_registry.register_stats('chongzhi_limiter', 'Upstream concurrency limiter',
+                                upstream_limiter.stats)
+# 同一激活码的并发验证只访问一次上游（重复点击、刷新）
+verify_flight = SingleFlight()
+metrics_registry.register_stats('chongzhi_verify_coalescing', 'Coalesced concurrent activation code verifications',
+                                verify_flight.stats)
+# 激活码验证结果短期缓存
+verify_cache = create_verify_cache_from_env()
+metrics_registry.register_stats('chongzhi_verify_cache', 'Activation code verification result cache',
+                                verify_cache.stats)
+metrics_registry.register_stats('chongzhi_retry_budget', 'Upstream retry budget',
+                                get_retry_budget().stats)
+metrics_registry.register_stats('chongzhi_log_queue', 'Asynchronous log queue',
+                                logging_stats)
+
+
+def render_index_page() -> PrecompressedPage:
+    """渲染主页并预先压缩"""
+    with app.app_context():
+        return PrecompressedPage(render_template('index.html').encode('utf-8'),
+                                 max_age=int(os.environ.get('INDEX_CACHE_MAX_AGE', '60')))
+
+
+# 主页内容是静态的：只渲染一次（启动时，或延迟初始化时第一次访问时）；较大的JSON响应即时压缩
+index_page = deferred(render_index_page)
+app.after_request(create_json_compressor_from_env())
 
 
 def log_api_call(action: str, success: bool, data: Dict = None, error: str = None):
-    """记录API调用日志"""
+    """记录API调用日志（结构化字段在日志线程中序列化）"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     log_data = {
-        'timestamp': datetime.now().isoformat(),
         'action': action,
         'success': success,
         'client_ip': request.remote_addr
@@ -56,16 +183,120 @@ def log_api_call(action: str, success: bool, data: Dict = None, error: str = Non
     if data:
         log_data['data'] = data
     
-    logger.info(f"API调用: {json.dumps(log_data, ensure_ascii=False)}")
+    logger.info("API调用", extra={'fields': log_data})
+
+
+def shed_load(view=None, slots: int = 1):
+    """
+    并发超限时直接拒绝，不在失效的上游后面排队
+    流式响应在正文生成完（或客户端断开）后才归还名额，上游调用都发生在生成正文时
+
+    :param view: 视图函数
+    :param slots: 每个请求占用的名额数
+    """
+    if view is None:
+        return lambda view: shed_load(view, slots)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not upstream_limiter.try_acquire(slots):
+            log_api_call(view.__name__, False, error='Server busy')
+            return jsonify({'success': False, 'error': get_friendly_error_message('Server busy', 'openai')}), 503
+        release = True
+        try:
+            response = view(*args, **kwargs)
+            if isinstance(response, Response) and response.is_streamed:
+                response.call_on_close(lambda: upstream_limiter.release(slots))
+                release = False
+            return response
+        finally:
+            if release:
+                upstream_limiter.release(slots)
+    return wrapper
 
 
 @app.route('/')
 def index():
-    """主页"""
-    return render_template('index.html')
+    """主页（调试模式下每次重新渲染，便于修改模板）"""
+    if app.debug:
+        return render_template('index.html')
+    return index_page.response(request)
+
+
+def verify_with_session(activation_code: str, session_id: str = None):
+    """
+    获取上游会话并验证激活码
+    
+    :param activation_code: 激活码
+    :param session_id: 可选，优先使用的 Session ID（如之前验证时使用的），默认从预热池取用
+    :return: (Session ID, 验证结果)，无法获取会话时 Session ID 为 None
+    """
+    client = api_client.ChongzhiProApiClient()
+    deadline = Deadline(app.config['VERIFY_DEADLINE'])
+    
+    # 获取会话（优先从预热池取用）
+    pooled = not session_id
+    if pooled:
+        session_id = session_pool.acquire(deadline=deadline)
+    if not session_id:
+        return None, None
+    
+    # 验证激活码
+    verify_result = client.verify_activation_code(session_id, activation_code, deadline=deadline)
+    
+    # 会话已被上游拒绝时，丢弃并同步获取新会话重试一次（池中的会话比它更早获取，一并丢弃）
+    if session_pool.is_rejection(verify_result):
+        if pooled:
+            session_pool.reject(session_id)
+        session_id = client.get_session(deadline=deadline)
+        if not session_id:
+            return None, None
+        verify_result = client.verify_activation_code(session_id, activation_code, deadline=deadline)
+    
+    return session_id, verify_result
+
+
+def verify_and_cache(activation_code: str, session_id: str = None):
+    """
+    验证激活码并写入缓存
+    
+    :param activation_code: 规范化后的激活码
+    :param session_id: 可选，优先使用的 Session ID
+    :return: (Session ID, 验证结果)
+    """
+    session_id, verify_result = verify_with_session(activation_code, session_id)
+    if session_id:
+        verify_cache.put(activation_code, session_id, verify_result)
+    return session_id, verify_result
+
+
+def verify_for_browser(activation_code: str):
+    """
+    为当前浏览器验证激活码
+    优先使用缓存的结果；同一激活码（规范化后）正在验证时，等待并共享那次上游调用的结果。
+    验证成功的结果绑定了验证时使用的上游会话，只有会话属于当前浏览器（会话中保存的就是它）时才沿用，
+    否则用当前浏览器自己的会话（没有时从预热池取用）重新验证，不同用户不会共用同一个上游会话
+    
+    :param activation_code: 规范化后的激活码
+    :return: (Session ID, 验证结果)，无法获取会话时 Session ID 为 None
+    """
+    own_session = session.get('cz_session') if session.get('cz_code') == activation_code else None
+    cached = verify_cache.get_for_session(activation_code, own_session)
+    if cached is not None:
+        return cached
+    
+    (session_id, verify_result), shared = verify_flight.do(
+        activation_code,
+        lambda: verify_and_cache(activation_code, own_session)
+    )
+    if shared and verify_result and verify_result.get('success', False) and session_id != own_session:
+        # 共享到的是其他请求的会话，不能写入当前浏览器
+        session_id, verify_result = verify_and_cache(activation_code, own_session)
+    return session_id, verify_result
 
 
 @app.route('/api/verify-code', methods=['POST'])
+@shed_load
 def verify_code():
     """验证激活码API"""
     try:
@@ -78,21 +309,15 @@ def verify_code():
         if not activation_code:
             return jsonify({'success': False, 'error': '请输入激活码'})
         
-        if not validate_activation_code(activation_code):
+        activation_code = parse_activation_code(activation_code)
+        if activation_code is None:
             return jsonify({'success': False, 'error': '激活码格式不正确。请输入3-4段格式的激活码，例如：XXXX-XXXX-XXXX-XXXX'})
         
-        # 创建API客户端
-        client = ChongzhiProApiClient()
-        
-        # 获取会话
-        session_id = client.get_session()
+        session_id, verify_result = verify_for_browser(activation_code)
         if not session_id:
             log_api_call('verify_code', False, error='无法获取会话')
             return jsonify({'success': False, 'error': '无法获取会话，请稍后重试'})
         
-        # 验证激活码
-        verify_result = client.verify_activation_code(session_id, activation_code)
-        
         if not verify_result.get('success', False):
             error_msg = get_friendly_error_message(
                 verify_result.get('error', '验证失败'), 
@@ -101,10 +326,9 @@ def verify_code():
             log_api_call('verify_code', False, error=error_msg)
             return jsonify({'success': False, 'error': error_msg})
         
-        # 保存会话信息
+        # 保存会话信息（只保存后续接口需要的字段，验证结果不写入会话）
         session['cz_session'] = session_id
         session['cz_code'] = activation_code
-        session['cz_verify'] = verify_result
         
         # 提取结果数据
         data_result = verify_result.get('data', {})
@@ -127,7 +351,267 @@ def verify_code():
         return jsonify({'success': False, 'error': f'服务器错误：{str(e)}'})
 
 
+def require_admin_token() -> bool:
+    """检查请求头 X-Admin-Token 是否与 ADMIN_TOKEN 一致"""
+    expected = app.config['ADMIN_TOKEN']
+    provided = request.headers.get('X-Admin-Token', '')
+    return bool(expected) and hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8'))
+
+
+@app.route('/api/verify-batch', methods=['POST'])
+@shed_load(slots=app.config['VERIFY_BATCH_CONCURRENCY'])
+def verify_batch():
+    """
+    批量验证激活码API
+    请求：{"activation_codes": [...]} 或每行一个激活码的纯文本
+    响应：NDJSON，每完成一个激活码输出一行，最后一行为汇总
+    """
+    if not require_admin_token():
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        raw_codes = data.get('activation_codes') or []
+        if not isinstance(raw_codes, list):
+            return jsonify({'success': False, 'error': 'activation_codes 必须是数组'}), 400
+    else:
+        raw_codes = request.get_data(as_text=True).splitlines()
+    
+    # 去除空行，规范化后去重，并校验格式
+    codes, invalid = parse_activation_codes(raw_codes)
+    
+    if len(codes) + len(invalid) > app.config['VERIFY_BATCH_MAX']:
+        return jsonify({'success': False, 'error': f"单次最多验证 {app.config['VERIFY_BATCH_MAX']} 个激活码"}), 400
+    
+    def line(code: str, verify_result: Dict[str, Any]) -> str:
+        if not verify_result.get('success', False):
+            item = {
+                'code': code,
+                'success': False,
+                'error': get_friendly_error_message(verify_result.get('error', '验证失败'), 'openai')
+            }
+        else:
+            data_result = verify_result.get('data', {})
+            item = {
+                'code': code,
+                'success': True,
+                'status': data_result.get('code_status', ''),
+                'is_new': not data_result.get('existing_record'),
+                'email': (data_result.get('existing_record') or {}).get('bound_email_masked', '')
+            }
+        return json_codec.dumps(item) + '\n'
+    
+    def generate():
+        succeeded = 0
+        for code in invalid:
+            yield json_codec.dumps({'code': code, 'success': False, 'error': '激活码格式不正确'}) + '\n'
+        
+        # 先输出缓存中的结果，其余的并发访问上游
+        pending = []
+        for code in codes:
+            cached = verify_cache.get(code)
+            if cached is None:
+                pending.append(code)
+                continue
+            succeeded += 1 if cached[1].get('success', False) else 0
+            yield line(code, cached[1])
+        
+        client = api_client.ChongzhiProApiClient()
+        for code, verify_result in client.verify_many(pending,
+                                                      max_workers=app.config['VERIFY_BATCH_CONCURRENCY'],
+                                                      session_factory=session_pool.acquire):
+            succeeded += 1 if verify_result.get('success', False) else 0
+            yield line(code, verify_result)
+        
+        log_api_call('verify_batch', True, {'total': len(codes) + len(invalid), 'succeeded': succeeded})
+        yield json_codec.dumps({
+            'done': True,
+            'total': len(codes) + len(invalid),
+            'invalid': len(invalid),
+            'succeeded': succeeded
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """格式化一条 Server-Sent Event"""
+    return f"event: {event}\ndata: {json_codec.dumps(data)}\n\n"
+
+
+# 上游结果中的诊断字段，只记录日志和指标，不返回给前端
+INTERNAL_RESULT_FIELDS = ('timing', 'request_sent', 'attempts')
+
+
+def public_result(action: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    去掉上游结果中的诊断字段（计时、是否已发出、重试次数），写入日志后返回前端可见的内容
+    
+    :param action: 接口名称，用于日志
+    :param result: 上游接口结果
+    :return: 返回给前端的结果
+    """
+    internals = {key: result[key] for key in INTERNAL_RESULT_FIELDS if key in result}
+    success = result.get('success', False)
+    log_api_call(action, success, internals or None,
+                 error=result.get('error') if not success else None)
+    return {key: value for key, value in result.items() if key not in INTERNAL_RESULT_FIELDS}
+
+
+def public_step(step: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把充值流程的步骤结果转换为返回给前端的内容（不包含Session等内部信息）
+    
+    :param step: 步骤结果
+    :return: 前端展示用的步骤信息
+    """
+    event = {
+        'step': step['step'],
+        'success': step.get('success', False),
+        'elapsed_ms': step.get('elapsed_ms')
+    }
+    result = step.get('result') or {}
+    if not event['success']:
+        event['error'] = get_friendly_error_message(step.get('error') or result.get('error', '操作失败'), 'openai')
+    elif step['step'] == 'verify_code':
+        data_result = result.get('data', {})
+        event['status'] = data_result.get('code_status', '')
+        event['is_new'] = not data_result.get('existing_record')
+        event['email'] = (data_result.get('existing_record') or {}).get('bound_email_masked', '')
+    elif result.get('message'):
+        event['message'] = result['message']
+    return event
+
+
+# 流式充值中用户选择的操作与卡密状态不符时的提示
+STATUS_MISMATCH_ERRORS = {
+    'used': '该激活码已经使用过，不能再次提交JSON Token。请选择"复用充值记录"，如需更换账户Token请使用"更新Token"',
+    'active': '该激活码尚未使用，没有可复用的充值记录，请粘贴JSON Token进行首次充值',
+}
+
+
+@app.route('/api/recharge-stream', methods=['POST'])
+@shed_load
+def recharge_stream():
+    """
+    一次请求完成充值流程（获取会话 -> 验证激活码 -> 复用/充值）
+    以 Server-Sent Events 推送进度：每完成一步发送 step 事件，最后发送 done 事件
+    会话和验证结果在推送前确定（优先使用刚才 /api/verify-code 的结果），推送过程中只执行复用/充值
+    提供 json_token 时为首次充值，否则为复用记录；与卡密状态不符时返回错误，不会改为执行另一种操作
+    """
+    if request.is_json:
+        data = request.get_json() or {}
+        activation_code = str(data.get('activation_code', '')).strip()
+        json_token = str(data.get('json_token', '')).strip()
+    else:
+        activation_code = request.form.get('activation_code', '').strip()
+        json_token = request.form.get('json_token', '').strip()
+    
+    if not activation_code:
+        return jsonify({'success': False, 'error': '请输入激活码'})
+    activation_code = parse_activation_code(activation_code)
+    if activation_code is None:
+        return jsonify({'success': False, 'error': '激活码格式不正确。请输入3-4段格式的激活码，例如：XXXX-XXXX-XXXX-XXXX'})
+    if json_token:
+        json_token, token_error = inspect_json_token(json_token)
+        if token_error:
+            return jsonify({'success': False, 'error': token_error})
+    
+    # 验证在开始推送前完成，最终使用的会话才能写入会话Cookie（响应头发出后无法再修改），供之后的更新Token等接口使用。
+    # 刚验证过的激活码直接使用缓存的结果；缓存已过期时沿用上次验证的会话，不再从预热池取新会话
+    session_id, verify_result = verify_for_browser(activation_code)
+    if not session_id:
+        log_api_call('recharge_stream', False, error='无法获取会话')
+        return jsonify({'success': False, 'error': '无法获取会话，请稍后重试'})
+    if verify_result.get('success', False):
+        session['cz_session'] = session_id
+        session['cz_code'] = activation_code
+        # 提交了 JSON Token 表示首次充值，没有则表示复用记录；与卡密状态不符时不替用户改成另一种操作
+        code_status = verify_result.get('data', {}).get('code_status', '')
+        if json_token and code_status == 'used':
+            log_api_call('recharge_stream', False, error='卡密已使用，未提交充值')
+            return jsonify({'success': False, 'error': STATUS_MISMATCH_ERRORS['used']})
+        if not json_token and code_status == 'active':
+            log_api_call('recharge_stream', False, error='卡密未使用，缺少JSON Token')
+            return jsonify({'success': False, 'error': STATUS_MISMATCH_ERRORS['active']})
+    
+    client = api_client.ChongzhiProApiClient()
+    
+    def generate():
+        done = {'success': False, 'error': '充值流程未完成'}
+        for step in client.iter_recharge_process(activation_code, json_token or None, session=session_id,
+                                                 verify_result=verify_result):
+            event = public_step(step)
+            yield sse_event('step', event)
+            if step['step'] in ('reuse_record', 'submit_recharge', 'decision') or not event['success']:
+                done = {key: value for key, value in event.items() if key in ('success', 'message', 'error')}
+        
+        # 充值后激活码状态已变化，缓存的验证结果作废
+        verify_cache.invalidate(activation_code)
+        log_api_call('recharge_stream', done['success'], error=done.get('error'))
+        yield sse_event('done', done)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/jobs', methods=['POST'])
+def create_jobs():
+    """
+    导入批量充值任务API
+    请求体为CSV（activation_code,json_token），也可用 multipart 上传 file 字段；导入后由后台线程执行
+    """
+    if not require_admin_token():
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    
+    upload = request.files.get('file')
+    stream = upload.stream if upload is not None else request.stream
+    try:
+        batch_id, total = jobs.get_job_store().ingest(
+            jobs.read_csv_jobs(io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')),
+            source=upload.filename if upload is not None else 'api'
+        )
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'success': False, 'error': f'CSV解析失败：{str(e)}'}), 400
+    
+    jobs.get_job_runner(on_finish=verify_cache.invalidate)
+    log_api_call('create_jobs', True, {'batch_id': batch_id, 'total': total})
+    return jsonify({'success': True, 'batch_id': batch_id, 'total': total})
+
+
+@app.route('/api/jobs', methods=['GET'])
+def jobs_status():
+    """批量充值任务整体进度与吞吐"""
+    if not require_admin_token():
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    
+    return jsonify({
+        'success': True,
+        'progress': jobs.get_job_store().progress(),
+        'runner': jobs.get_job_runner(on_finish=verify_cache.invalidate).stats()
+    })
+
+
+@app.route('/api/jobs/<batch_id>', methods=['GET'])
+def job_batch_status(batch_id: str):
+    """单个批次的进度和失败原因"""
+    if not require_admin_token():
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    
+    store = jobs.get_job_store()
+    if not store.batch_exists(batch_id):
+        return jsonify({'success': False, 'error': '批次不存在'}), 404
+    
+    return jsonify({
+        'success': True,
+        'batch_id': batch_id,
+        'progress': store.progress(batch_id),
+        'failures': store.failures(batch_id)
+    })
+
+
 @app.route('/api/submit-json', methods=['POST'])
+@shed_load
 def submit_json():
     """提交JSON Token API"""
     try:
@@ -140,11 +624,21 @@ def submit_json():
         if not json_token:
             return jsonify({'success': False, 'error': '请粘贴JSON Token'})
         
+        # 本地预检：格式错误或已过期的Token不再请求上游
+        json_token, token_error = inspect_json_token(json_token)
+        if token_error:
+            log_api_call('submit_json', False, error=token_error)
+            return jsonify({'success': False, 'error': token_error})
+        
         if 'cz_session' not in session:
             return jsonify({'success': False, 'error': '会话失效，请重新验证激活码'})
         
-        client = ChongzhiProApiClient()
-        result = client.submit_recharge(session['cz_session'], json_token)
+        client = api_client.ChongzhiProApiClient()
+        result = client.submit_recharge(session['cz_session'], json_token,
+                                        activation_code=session.get('cz_code'))
+        # 充值后激活码状态已变化（或无法确定），缓存的验证结果作废
+        if 'cz_code' in session:
+            verify_cache.invalidate(normalize_activation_code(session['cz_code']))
         
         if not result.get('success', False):
             error_msg = get_friendly_error_message(
@@ -153,10 +647,7 @@ def submit_json():
             )
             result['error'] = error_msg
         
-        log_api_call('submit_json', result.get('success', False), 
-                    error=result.get('error') if not result.get('success', False) else None)
-        
-        return jsonify(result)
+        return jsonify(public_result('submit_json', result))
         
     except Exception as e:
         logger.exception("提交JSON Token时发生异常")
@@ -164,13 +655,14 @@ def submit_json():
 
 
 @app.route('/api/reuse-record', methods=['POST'])
+@shed_load
 def reuse_record():
     """复用充值记录API"""
     try:
         if 'cz_session' not in session:
             return jsonify({'success': False, 'error': '会话失效，请重新验证激活码'})
         
-        client = ChongzhiProApiClient()
+        client = api_client.ChongzhiProApiClient()
         result = client.reuse_record(session['cz_session'])
         
         if not result.get('success', False):
@@ -180,10 +672,7 @@ def reuse_record():
             )
             result['error'] = error_msg
         
-        log_api_call('reuse_record', result.get('success', False),
-                    error=result.get('error') if not result.get('success', False) else None)
-        
-        return jsonify(result)
+        return jsonify(public_result('reuse_record', result))
         
     except Exception as e:
         logger.exception("复用充值记录时发生异常")
@@ -191,6 +680,7 @@ def reuse_record():
 
 
 @app.route('/api/update-token', methods=['POST'])
+@shed_load
 def update_token():
     """更新Token API"""
     try:
@@ -203,15 +693,22 @@ def update_token():
         if not json_token:
             return jsonify({'success': False, 'error': '请粘贴JSON Token'})
         
+        # 本地预检：格式错误或已过期的Token不再请求上游
+        json_token, token_error = inspect_json_token(json_token)
+        if token_error:
+            log_api_call('update_token', False, error=token_error)
+            return jsonify({'success': False, 'error': token_error})
+        
         if 'cz_session' not in session or 'cz_code' not in session:
             return jsonify({'success': False, 'error': '会话失效，请重新验证激活码'})
         
-        client = ChongzhiProApiClient()
+        client = api_client.ChongzhiProApiClient()
         result = client.update_token_and_recharge(
             session['cz_session'], 
             session['cz_code'], 
             json_token
         )
+        verify_cache.invalidate(normalize_activation_code(session['cz_code']))
         
         if not result.get('success', False):
             error_msg = get_friendly_error_message(
@@ -220,10 +717,7 @@ def update_token():
             )
             result['error'] = error_msg
         
-        log_api_call('update_token', result.get('success', False),
-                    error=result.get('error') if not result.get('success', False) else None)
-        
-        return jsonify(result)
+        return jsonify(public_result('update_token', result))
         
     except Exception as e:
         logger.exception("更新Token时发生异常")
@@ -232,14 +726,38 @@ def update_token():
 
 @app.route('/api/health')
 def health_check():
-    """健康检查API"""
-    return jsonify({
+    """健康检查API（连接池、熔断、缓存等内部统计需要 X-Admin-Token）"""
+    health = {
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'version': '1.0.0'
+    }
+    if not require_admin_token():
+        return jsonify(health)
+    
+    return jsonify({
+        **health,
+        'upstream_pool': upstream_pool_stats(),
+        'session_pool': session_pool_stats(),
+        'session_bootstrap': session_bootstrap_stats(),
+        'circuit_breakers': breaker_stats(),
+        'limiter': upstream_limiter.stats(),
+        'retry_budget': get_retry_budget().stats(),
+        'verify_coalescing': verify_flight.stats(),
+        'verify_cache': verify_cache.stats(),
+        'log_queue': logging_stats()
     })
 
 
+@app.route('/api/metrics')
+def metrics():
+    """Prometheus 指标（需要 X-Admin-Token，METRICS_PUBLIC=1 时公开）"""
+    if not app.config['METRICS_PUBLIC'] and not require_admin_token():
+        return jsonify({'success': False, 'error': '无权访问'}), 403
+    
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.errorhandler(404)
 def not_found_error(error):
     """404错误处理"""
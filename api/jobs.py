@@ -0,0 +1,617 @@
+"""
+批量充值任务
+从CSV文件流式导入 (activation_code, json_token)，保存到本地SQLite队列，
+由线程池或异步协程执行 full_recharge_process，按每秒任务数限速。
+任务成功后立即清除保存的 json_token（失败的保留，以便重试）。
+Web 进程内的执行器完成任务后会作废该激活码的验证缓存；命令行在另一个进程中执行，无法作废 Web 进程的缓存，
+同一激活码在 Web 端最多看到 VERIFY_CACHE_ACTIVE_TTL 秒的旧状态，因此不要同时在 Web 端和批量任务中使用同一批激活码。
+
+多个进程（Web worker、命令行）可以共用同一个队列：领取任务时记录执行者和租约到期时间，执行期间由心跳线程续期。
+租约过期（执行者已退出或失联）的执行中任务不会自动重新执行：充值请求可能已经到达上游，
+重新执行会重复提交，因此直接标记为失败（step 为 lease_expired），核对后用 retry-failed 重新排队。
+导入在全部行写入后才一次性进入队列，CSV解析失败时已写入的行会被删除。
+
+CSV格式：每行 activation_code,json_token（json_token 含逗号和引号，需按CSV规则加引号），可带表头
+
+命令行：
+python api/jobs.py ingest codes.csv
+python api/jobs.py run --workers 8 --rate 5
+python api/jobs.py run --mode async --workers 32
+python api/jobs.py status
+python api/jobs.py retry-failed
+
+配置（环境变量）：
+JOBS_DB_PATH   队列数据库文件，默认 /tmp/gpt_recharge_jobs.sqlite3
+JOBS_WORKERS   并发数，默认 4
+JOBS_RATE      每秒最多开始的任务数（每个任务约3次上游请求），默认 5，0 表示不限速
+JOBS_LEASE_SECONDS  任务租约时长（秒），默认 60；执行者退出后最多等待这么久任务才会被标记为失败
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, Any, Iterable, List, Optional, TextIO, Tuple
+
+from activation_code import parse_activation_code
+from api_client import ChongzhiProApiClient
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+JOB_STATUSES = (PENDING, RUNNING, SUCCEEDED, FAILED)
+# 导入中的行，整个文件导入成功后才改为 PENDING
+STAGED = 'staged'
+
+# 租约过期任务的结果
+LEASE_EXPIRED_RESULT = {
+    'success': False,
+    'step': 'lease_expired',
+    'error': '执行者在任务完成前退出，充值可能已提交，请核对后用 retry-failed 重新执行',
+}
+
+# 导入时每批写入的行数
+INGEST_CHUNK_SIZE = 500
+
+
+class JobStore:
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        """
+        构造函数
+        :param path: 数据库文件路径
+        :param lease_seconds: 任务租约时长（秒），执行者需在到期前调用 heartbeat 续期
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        # 执行者标识，区分共用同一个队列的不同进程
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS batches ('
+            'id TEXT PRIMARY KEY, source TEXT, created REAL NOT NULL, total INTEGER NOT NULL DEFAULT 0)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, batch_id TEXT NOT NULL, '
+            'activation_code TEXT NOT NULL, json_token TEXT NOT NULL, '
+            'status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, '
+            'result TEXT, updated REAL NOT NULL)'
+        )
+        # 旧版本创建的队列没有租约字段
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+        if 'owner' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN owner TEXT')
+        if 'lease_until' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN lease_until REAL')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_batch ON jobs (batch_id, status)')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 自动提交模式，需要原子操作时显式 BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def ingest(self, rows: Iterable[Tuple[str, str]], source: str = '') -> Tuple[str, int]:
+        """
+        导入任务（分批写入，不把整个文件读入内存）
+        各批先以 STAGED 状态写入，全部写完后在一个事务中改为 PENDING 并创建批次；
+        rows 抛出异常（如CSV解析失败）时删除已写入的行，队列中不会留下半个批次
+
+        :param rows: (激活码, JSON Token) 迭代器
+        :param source: 来源说明（如文件名）
+        :return: (批次ID, 导入数量)
+        """
+        batch_id = uuid.uuid4().hex[:12]
+        conn = self._connect()
+
+        total = 0
+        try:
+            chunk: List[tuple] = []
+            for activation_code, json_token in rows:
+                chunk.append((batch_id, activation_code, json_token, STAGED, time.time()))
+                if len(chunk) >= INGEST_CHUNK_SIZE:
+                    total += self._insert(conn, chunk)
+                    chunk = []
+            if chunk:
+                total += self._insert(conn, chunk)
+        except BaseException:
+            conn.execute('DELETE FROM jobs WHERE batch_id = ? AND status = ?', (batch_id, STAGED))
+            raise
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('INSERT INTO batches (id, source, created, total) VALUES (?, ?, ?, ?)',
+                         (batch_id, source, time.time(), total))
+            conn.execute('UPDATE jobs SET status = ?, updated = ? WHERE batch_id = ? AND status = ?',
+                         (PENDING, time.time(), batch_id, STAGED))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            conn.execute('DELETE FROM jobs WHERE batch_id = ? AND status = ?', (batch_id, STAGED))
+            raise
+        return batch_id, total
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, chunk: List[tuple]) -> int:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO jobs (batch_id, activation_code, json_token, status, updated) VALUES (?, ?, ?, ?, ?)',
+                chunk,
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return len(chunk)
+
+    def claim(self, limit: int = 1) -> List[Tuple[int, str, str]]:
+        """
+        原子地领取待执行任务并标记为执行中（记录执行者和租约到期时间）
+        同时把租约已过期的执行中任务标记为失败（可能已提交充值，不能自动重新执行）
+
+        :param limit: 最多领取数量
+        :return: [(任务ID, 激活码, JSON Token)]
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            # 没有租约的执行中任务来自旧版本队列，同样视为已过期
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, lease_until = NULL, updated = ? '
+                'WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)',
+                (FAILED, json.dumps(LEASE_EXPIRED_RESULT, ensure_ascii=False), now, RUNNING, now),
+            )
+            rows = conn.execute(
+                'SELECT id, activation_code, json_token FROM jobs WHERE status = ? ORDER BY id LIMIT ?',
+                (PENDING, limit),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    'UPDATE jobs SET status = ?, owner = ?, lease_until = ?, attempts = attempts + 1, updated = ? '
+                    'WHERE id = ?',
+                    [(RUNNING, self.owner, now + self.lease_seconds, now, row[0]) for row in rows],
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return rows
+
+    def complete(self, job_id: int, success: bool, result: Dict[str, Any]) -> bool:
+        """
+        记录任务结果，成功时清除保存的 JSON Token
+
+        :param job_id: 任务ID
+        :param success: 是否成功
+        :param result: 结果摘要
+        :return: 是否已记录（租约已被其他执行者接管时不覆盖）
+        """
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, updated = ?, lease_until = NULL, "
+            "json_token = CASE WHEN ? THEN '' ELSE json_token END WHERE id = ? AND status = ? AND owner = ?",
+            (SUCCEEDED if success else FAILED, json.dumps(result, ensure_ascii=False), time.time(), success, job_id,
+             RUNNING, self.owner),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self) -> int:
+        """
+        为本执行者正在执行的任务续租
+
+        :return: 续租的任务数
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            'UPDATE jobs SET lease_until = ? WHERE status = ? AND owner = ?',
+            (now + self.lease_seconds, RUNNING, self.owner),
+        )
+        return cursor.rowcount
+
+    def retry_failed(self, batch_id: str = None) -> int:
+        """
+        把失败的任务重新放回队列
+
+        :param batch_id: 可选，只处理指定批次
+        :return: 重新排队的任务数
+        """
+        sql = 'UPDATE jobs SET status = ?, updated = ? WHERE status = ?'
+        params: list = [PENDING, time.time(), FAILED]
+        if batch_id:
+            sql += ' AND batch_id = ?'
+            params.append(batch_id)
+        return self._connect().execute(sql, params).rowcount
+
+    def progress(self, batch_id: str = None) -> Dict[str, int]:
+        """
+        各状态任务数
+
+        :param batch_id: 可选，只统计指定批次
+        :return: 状态 -> 数量（含 total）
+        """
+        sql = 'SELECT status, COUNT(*) FROM jobs'
+        params: tuple = ()
+        if batch_id:
+            sql += ' WHERE batch_id = ?'
+            params = (batch_id,)
+        counts = {status: 0 for status in JOB_STATUSES}
+        for status, count in self._connect().execute(sql + ' GROUP BY status', params):
+            # 不统计导入中的行
+            if status in counts:
+                counts[status] = count
+        counts['total'] = sum(counts[status] for status in JOB_STATUSES)
+        return counts
+
+    def batch_exists(self, batch_id: str) -> bool:
+        return self._connect().execute('SELECT 1 FROM batches WHERE id = ?', (batch_id,)).fetchone() is not None
+
+    def failures(self, batch_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        批次中失败任务的结果
+
+        :param batch_id: 批次ID
+        :param limit: 最多返回数量
+        :return: [{'activation_code', 'result'}]
+        """
+        rows = self._connect().execute(
+            'SELECT activation_code, result FROM jobs WHERE batch_id = ? AND status = ? ORDER BY id LIMIT ?',
+            (batch_id, FAILED, limit),
+        ).fetchall()
+        return [{'activation_code': code, 'result': json.loads(result or '{}')} for code, result in rows]
+
+
+def read_csv_jobs(stream: TextIO) -> Iterable[Tuple[str, str]]:
+    """
+    逐行解析CSV（跳过表头和空行，激活码规范化）
+
+    :param stream: 文本流
+    :return: (激活码, JSON Token) 迭代器
+    """
+    for index, row in enumerate(csv.reader(stream)):
+        if len(row) < 2 or not row[0].strip():
+            continue
+        activation_code, json_token = row[0].strip(), row[1].strip()
+        if index == 0 and activation_code.lower() in ('activation_code', 'code', '激活码'):
+            continue
+        # 格式不正确的激活码原样入队，由上游返回错误并记入失败列表
+        yield parse_activation_code(activation_code) or activation_code, json_token
+
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        """
+        构造函数
+        :param rate: 每秒允许的次数，0 表示不限速
+        """
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def reserve(self) -> float:
+        """
+        预约一次执行机会
+
+        :return: 需要等待的秒数
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + 1.0 / self.rate
+            return start - now
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    从 full_recharge_process 结果中提取需要保存的信息（不含Session）
+
+    :param result: 完整流程结果
+    :return: 结果摘要
+    """
+    last_step = result['steps'][-1] if result.get('steps') else {}
+    step_result = last_step.get('result') or {}
+    summary = {
+        'success': result.get('success', False),
+        'step': last_step.get('step'),
+        'elapsed_ms': round(sum(step.get('elapsed_ms', 0) for step in result.get('steps', [])), 2),
+    }
+    error = last_step.get('error') or step_result.get('error')
+    if error:
+        summary['error'] = error
+    if step_result.get('message'):
+        summary['message'] = step_result['message']
+    return summary
+
+
+class JobRunner:
+    def __init__(self, store: JobStore, workers: int = 4, rate: float = 5.0,
+                 client_factory: Callable[[], Any] = ChongzhiProApiClient,
+                 on_finish: Callable[[str], None] = None):
+        """
+        构造函数
+        :param store: 任务队列
+        :param workers: 并发数（线程数或协程数）
+        :param rate: 每秒最多开始的任务数
+        :param client_factory: 创建API客户端的函数
+        :param on_finish: 可选，任务完成后以激活码调用（如作废Web进程中缓存的验证结果）
+        """
+        self.store = store
+        self.workers = workers
+        self.limiter = RateLimiter(rate)
+        self.client_factory = client_factory
+        self.on_finish = on_finish
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._heartbeat_stop: Optional[threading.Event] = None
+        self._started_at: Optional[float] = None
+        self._active = 0
+        self._processed = 0
+        self._succeeded = 0
+        self._failed = 0
+        # 最近完成时间，用于计算最近一分钟吞吐
+        self._recent = deque()
+
+    def _record(self, success: bool):
+        now = time.monotonic()
+        with self._lock:
+            self._processed += 1
+            if success:
+                self._succeeded += 1
+            else:
+                self._failed += 1
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - 60:
+                self._recent.popleft()
+
+    def _finish(self, job_id: int, activation_code: str, result: Dict[str, Any]):
+        summary = summarize_result(result)
+        self.store.complete(job_id, summary['success'], summary)
+        self._record(summary['success'])
+        # 充值后激活码状态已变化（或无法确定）
+        if self.on_finish is not None:
+            self.on_finish(activation_code)
+
+    def _heartbeat(self, stop: threading.Event):
+        """后台线程：在租约过期前为执行中的任务续租"""
+        interval = self.store.lease_seconds / 3
+        while not stop.wait(interval):
+            self.store.heartbeat()
+
+    def _start_heartbeat(self) -> threading.Event:
+        stop = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(stop,), name='job-heartbeat', daemon=True).start()
+        return stop
+
+    def _worker(self, drain: bool, idle_interval: float):
+        client = self.client_factory()
+        while not self._stop.is_set():
+            jobs = self.store.claim(1)
+            if not jobs:
+                if drain:
+                    return
+                self._stop.wait(idle_interval)
+                continue
+            job_id, activation_code, json_token = jobs[0]
+            time.sleep(self.limiter.reserve())
+            with self._lock:
+                self._active += 1
+            try:
+                result = client.full_recharge_process(activation_code, json_token)
+            except Exception as e:
+                result = {'success': False, 'steps': [{'step': 'exception', 'success': False, 'error': str(e)}]}
+            finally:
+                with self._lock:
+                    self._active -= 1
+            self._finish(job_id, activation_code, result)
+
+    def start(self, drain: bool = False, idle_interval: float = 2.0) -> 'JobRunner':
+        """
+        在后台线程中开始执行（租约过期的执行中任务会被重新领取）
+
+        :param drain: True 时队列为空后线程退出，否则持续等待新任务
+        :param idle_interval: 队列为空时的轮询间隔（秒）
+        :return: self
+        """
+        self._stop.clear()
+        self._heartbeat_stop = self._start_heartbeat()
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._worker, args=(drain, idle_interval), name=f'job-worker-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+        if self._heartbeat_stop is not None:
+            self._heartbeat_stop.set()
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stop(self):
+        """停止领取新任务，已开始的任务执行完后退出"""
+        self._stop.set()
+        self.join()
+
+    def run_async(self):
+        """用异步客户端执行队列中的所有任务，直到队列为空"""
+        from async_api_client import AsyncChongzhiProApiClient, close_shared_async_http_client
+
+        # SQLite 调用会阻塞（BEGIN IMMEDIATE 最多等待10秒），放到线程中执行，不阻塞其他协程
+        async def worker(client):
+            while not self._stop.is_set():
+                jobs = await asyncio.to_thread(self.store.claim, 1)
+                if not jobs:
+                    return
+                job_id, activation_code, json_token = jobs[0]
+                await asyncio.sleep(self.limiter.reserve())
+                with self._lock:
+                    self._active += 1
+                try:
+                    result = await client.full_recharge_process(activation_code, json_token)
+                except Exception as e:
+                    result = {'success': False, 'steps': [{'step': 'exception', 'success': False, 'error': str(e)}]}
+                finally:
+                    with self._lock:
+                        self._active -= 1
+                await asyncio.to_thread(self._finish, job_id, activation_code, result)
+
+        async def main():
+            try:
+                async with AsyncChongzhiProApiClient() as client:
+                    await asyncio.gather(*(worker(client) for _ in range(self.workers)))
+            finally:
+                await close_shared_async_http_client()
+
+        self._started_at = time.monotonic()
+        heartbeat_stop = self._start_heartbeat()
+        try:
+            asyncio.run(main())
+        finally:
+            heartbeat_stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        执行统计
+
+        :return: 已处理数量、成功/失败数、吞吐（任务/秒）
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            recent_window = min(60.0, elapsed)
+            return {
+                'workers': self.workers,
+                'active': self._active,
+                'processed': self._processed,
+                'succeeded': self._succeeded,
+                'failed': self._failed,
+                'throughput': round(self._processed / elapsed, 3) if elapsed else 0.0,
+                'recent_throughput': round(len(self._recent) / recent_window, 3) if recent_window else 0.0,
+            }
+
+
+_store: Optional[JobStore] = None
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """获取进程内共享的任务队列（JOBS_DB_PATH、JOBS_LEASE_SECONDS）"""
+    global _store
+    with _runner_lock:
+        if _store is None:
+            _store = JobStore(os.environ.get('JOBS_DB_PATH', '/tmp/gpt_recharge_jobs.sqlite3'),
+                              lease_seconds=float(os.environ.get('JOBS_LEASE_SECONDS', '60')))
+        return _store
+
+
+def get_job_runner(on_finish: Callable[[str], None] = None) -> JobRunner:
+    """
+    获取并启动进程内共享的后台任务执行器（JOBS_WORKERS、JOBS_RATE）
+
+    :param on_finish: 可选，第一次创建时使用的任务完成回调，见 JobRunner
+    :return: JobRunner
+    """
+    global _runner
+    store = get_job_store()
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(
+                store,
+                workers=int(os.environ.get('JOBS_WORKERS', '4')),
+                rate=float(os.environ.get('JOBS_RATE', '5')),
+                on_finish=on_finish,
+            ).start()
+        return _runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量充值任务')
+    parser.add_argument('--db', default=os.environ.get('JOBS_DB_PATH', '/tmp/gpt_recharge_jobs.sqlite3'),
+                        help='队列数据库文件')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='导入CSV文件')
+    ingest_parser.add_argument('file', help='CSV文件路径，- 表示标准输入')
+
+    run_parser = subparsers.add_parser('run', help='执行队列中的任务，队列为空后退出')
+    run_parser.add_argument('--workers', type=int, default=int(os.environ.get('JOBS_WORKERS', '4')), help='并发数')
+    run_parser.add_argument('--rate', type=float, default=float(os.environ.get('JOBS_RATE', '5')),
+                            help='每秒最多开始的任务数，0 表示不限速')
+    run_parser.add_argument('--mode', choices=('thread', 'async'), default='thread', help='线程池或异步协程')
+
+    status_parser = subparsers.add_parser('status', help='查看任务进度')
+    status_parser.add_argument('--batch', help='批次ID')
+
+    retry_parser = subparsers.add_parser('retry-failed', help='失败任务重新排队')
+    retry_parser.add_argument('--batch', help='批次ID')
+
+    args = parser.parse_args()
+    if args.command == 'run' and args.mode == 'async':
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            parser.error('--mode async 需要安装 httpx：pip install httpx（或 pip install -r requirements-optional.txt）')
+    store = JobStore(args.db, lease_seconds=float(os.environ.get('JOBS_LEASE_SECONDS', '60')))
+
+    if args.command == 'ingest':
+        if args.file == '-':
+            batch_id, total = store.ingest(read_csv_jobs(sys.stdin), source='stdin')
+        else:
+            with open(args.file, newline='', encoding='utf-8-sig') as f:
+                batch_id, total = store.ingest(read_csv_jobs(f), source=os.path.basename(args.file))
+        print(f'已导入 {total} 个任务，批次: {batch_id}')
+
+    elif args.command == 'run':
+        runner = JobRunner(store, workers=args.workers, rate=args.rate)
+        try:
+            if args.mode == 'async':
+                runner.run_async()
+            else:
+                runner.start(drain=True)
+                reported_at = time.monotonic()
+                while runner.is_running():
+                    time.sleep(0.5)
+                    if time.monotonic() - reported_at >= 5:
+                        reported_at = time.monotonic()
+                        print(json.dumps({'runner': runner.stats(), 'progress': store.progress()}, ensure_ascii=False))
+                runner.join()
+        except KeyboardInterrupt:
+            # 执行中的任务在租约过期后标记为失败，核对后用 retry-failed 重新执行
+            print('已中断')
+            return
+        print(json.dumps({'runner': runner.stats(), 'progress': store.progress()}, ensure_ascii=False))
+
+    elif args.command == 'status':
+        print(json.dumps(store.progress(args.batch), ensure_ascii=False))
+
+    elif args.command == 'retry-failed':
+        print(f'已重新排队 {store.retry_failed(args.batch)} 个任务')
+
+
+if __name__ == '__main__':
+    main()
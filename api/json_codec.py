@@ -0,0 +1,94 @@
+"""
+JSON 编解码
+安装了 orjson 时使用 orjson，否则回退到标准库 json；两者输出的都是紧凑、不转义非ASCII字符的 JSON。
+orjson 是可选依赖（见 requirements-optional.txt），不安装时功能不变，只是编解码较慢。
+JSON_BACKEND=json 可以强制使用标准库（排查兼容问题时使用）。
+
+loads 直接接受响应字节，不需要先解码成 response.text。
+"""
+
+import json
+import os
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+BACKEND = 'orjson' if orjson is not None and os.environ.get('JSON_BACKEND', '').lower() != 'json' else 'json'
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方只需要捕获这一个
+JSONDecodeError = json.JSONDecodeError
+
+# 标准库默认参数下复用同一个编解码器，避免每次调用都重新构造
+_decoder = json.JSONDecoder()
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+if BACKEND == 'orjson':
+    # 日期、dataclass 交给 default 处理，与 Flask 默认的序列化结果保持一致
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def loads(data) -> Any:
+    """
+    解析JSON
+
+    :param data: bytes 或 str
+    :return: 解析结果
+    """
+    if isinstance(data, (bytes, bytearray)):
+        if data.startswith(_UTF8_BOM):
+            data = data[len(_UTF8_BOM):]
+        if BACKEND == 'orjson':
+            return orjson.loads(data)
+        try:
+            data = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise JSONDecodeError(f'响应不是有效的UTF-8: {e}', '', 0) from e
+    elif BACKEND == 'orjson':
+        return orjson.loads(data)
+    return _decoder.decode(data)
+
+
+def dumps_bytes(obj: Any, default: Callable[[Any], Any] = None, sort_keys: bool = False) -> bytes:
+    """
+    序列化为 UTF-8 字节
+
+    :param obj: 要序列化的对象
+    :param default: 可选，无法直接序列化的对象的转换函数
+    :param sort_keys: 是否按键排序
+    :return: JSON 字节
+    """
+    if BACKEND == 'orjson':
+        try:
+            return orjson.dumps(obj, default=default,
+                                option=_ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+        except TypeError:
+            # 超过64位的整数等 orjson 不支持的值交给标准库处理
+            pass
+    return _stdlib_dumps(obj, default, sort_keys).encode('utf-8')
+
+
+def dumps(obj: Any, default: Callable[[Any], Any] = None, sort_keys: bool = False) -> str:
+    """
+    序列化为字符串
+
+    :param obj: 要序列化的对象
+    :param default: 可选，无法直接序列化的对象的转换函数
+    :param sort_keys: 是否按键排序
+    :return: JSON 字符串
+    """
+    if BACKEND == 'orjson':
+        return dumps_bytes(obj, default, sort_keys).decode('utf-8')
+    return _stdlib_dumps(obj, default, sort_keys)
+
+
+def _stdlib_dumps(obj: Any, default: Callable[[Any], Any] = None, sort_keys: bool = False) -> str:
+    """标准库序列化（紧凑、不转义非ASCII字符）"""
+    if default is None and not sort_keys:
+        return _encoder.encode(obj)
+    return json.dumps(obj, default=default, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':'))
+
@@ -0,0 +1,84 @@
+"""
+延迟初始化（冷启动优化）
+Serverless 冷启动时 requests/urllib3、批量任务（asyncio、sqlite3）和模板渲染都发生在第一个请求之前。
+开启后这些模块、上游会话池和主页在第一次使用时才加载，导入 index.py 只加载 Flask 和轻量模块。
+
+LAZY_INIT=1 开启，0 关闭；未设置时在 Vercel 上（存在 VERCEL 环境变量）默认开启，其他环境默认关闭。
+冷启动耗时可用 benchmarks/bench_startup.py 测量。
+"""
+
+import importlib
+import os
+import threading
+from types import ModuleType
+from typing import Any, Callable, Union
+
+LAZY_INIT = os.environ.get('LAZY_INIT', '1' if os.environ.get('VERCEL') else '0') == '1'
+
+
+class LazyModule:
+    """第一次访问属性时才导入的模块"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module
+        if module is None:
+            # 导入系统自带模块级锁，并发的首次访问会等待同一次导入完成
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+
+class LazyObject:
+    """第一次访问属性时才调用 factory 创建的对象"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._target = None
+
+    def _resolve(self) -> Any:
+        target = self._target
+        if target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+                target = self._target
+        return target
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+
+def lazy_module(name: str) -> Union[ModuleType, LazyModule]:
+    """
+    导入模块（延迟初始化开启时推迟到第一次使用）
+
+    :param name: 模块名
+    :return: 模块或 LazyModule
+    """
+    if LAZY_INIT:
+        return LazyModule(name)
+    return importlib.import_module(name)
+
+
+def deferred(factory: Callable[[], Any]) -> Any:
+    """
+    创建对象（延迟初始化开启时推迟到第一次使用）
+
+    :param factory: 创建函数
+    :return: 对象或 LazyObject
+    """
+    if LAZY_INIT:
+        return LazyObject(factory)
+    return factory()
@@ -0,0 +1,145 @@
+"""
+异步日志
+请求线程只把日志记录放进有界队列，由后台线程格式化并写到标准输出，stdout 阻塞不会拖慢请求。
+队列满时直接丢弃新记录并计数（WARNING 及以上级别同样会丢弃，但单独计数）。
+
+记录的结构化字段通过 extra={'fields': {...}} 传入，在后台线程序列化：
+LOG_FORMAT=json（默认）每行一个 JSON 对象；LOG_FORMAT=text 为原来的文本格式，字段以 JSON 附在消息后面。
+LOG_QUEUE_SIZE 为队列长度（默认 10000，0 表示关闭队列、同步写出），LOG_LEVEL 为日志级别（默认 INFO）。
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+import json_codec
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json_codec.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """文本格式，结构化字段以 JSON 附在消息后面"""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            message = f'{message}: {json_codec.dumps(fields, default=str)}'
+        return message
+
+
+class DroppingQueueHandler(QueueHandler):
+    """队列满时丢弃记录而不是阻塞的 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._stats_lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+        self._dropped_warnings = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        只在请求线程里处理异常堆栈，消息格式化和序列化留给后台线程
+
+        :param record: 日志记录
+        :return: 放入队列的记录副本
+        """
+        record = copy.copy(record)
+        if record.exc_info:
+            # traceback 会引用请求线程的栈帧，先转成文本
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+                if record.levelno >= logging.WARNING:
+                    self._dropped_warnings += 1
+            return
+        with self._stats_lock:
+            self._enqueued += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'queued': self.queue.qsize(),
+                'capacity': self.queue.maxsize,
+                'enqueued': self._enqueued,
+                'dropped': self._dropped,
+                'dropped_warnings': self._dropped_warnings,
+            }
+
+
+_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging_from_env():
+    """
+    根据环境变量配置根日志：控制台输出，默认经过异步队列
+    重复调用或根日志已有处理器时不做改动
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    if os.environ.get('LOG_FORMAT', 'json').lower() == 'text':
+        formatter = TextFormatter('%(asctime)s - %(levelname)s - %(message)s')
+    else:
+        formatter = JsonFormatter()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    if root.handlers:
+        # 与 logging.basicConfig 一致：宿主程序已配置日志时不做改动
+        return
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+
+    queue_size = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    if queue_size <= 0:
+        root.addHandler(stream_handler)
+        return
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    _listener = QueueListener(_handler.queue, stream_handler, respect_handler_level=True)
+    root.addHandler(_handler)
+    _listener.start()
+    # 退出时写完队列中剩余的日志
+    atexit.register(_listener.stop)
+
+
+def logging_stats() -> Dict[str, Any]:
+    """获取日志队列统计（未启用队列时为空）"""
+    if _handler is None:
+        return {}
+    return _handler.stats()
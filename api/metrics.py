@@ -0,0 +1,238 @@
+"""
+进程内指标
+直方图与计数器按标签聚合，以 Prometheus 文本格式输出（/api/metrics）
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Any, List, Sequence, Tuple
+
+
+# 上游请求耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        构造函数
+        :param name: 指标名
+        :param documentation: 说明
+        :param labelnames: 标签名
+        :param buckets: 分桶上界（升序）
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # 标签值 -> [各分桶计数..., 总和, 总数]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        """
+        记录一个观测值
+
+        :param value: 观测值
+        :param labelvalues: 标签值，顺序与 labelnames 一致
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = [0] * (len(self.buckets) + 2)
+                self._series[labelvalues] = series
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, labelvalues, ('le', '+Inf'))
+            lines.append(f'{self.name}_bucket{labels} {int(series[-1])}')
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{labels} {int(series[-1])}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        构造函数
+        :param name: 指标名（约定以 _total 结尾）
+        :param documentation: 说明
+        :param labelnames: 标签名
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        """
+        计数加一（或加 amount）
+
+        :param labelvalues: 标签值
+        :param amount: 增量
+        """
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}')
+        return lines
+
+
+class _StatsCollector:
+    """把已有的 stats() 字典按数值字段导出为 gauge"""
+
+    def __init__(self, prefix: str, documentation: str, source: Callable[[], Dict[str, Any]]):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.source = source
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, value in _flatten(self.source()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f'{self.prefix}_{key}'
+            lines.append(f'# HELP {name} {self.documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {_format_value(value)}')
+        return lines
+
+
+def _flatten(data: Dict[str, Any], prefix: str = ''):
+    for key, value in data.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from _flatten(value, f'{name}_')
+        else:
+            yield name, value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """获取或创建直方图"""
+        return self._get_or_create(name, lambda: Histogram(name, documentation, labelnames, buckets))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """获取或创建计数器"""
+        return self._get_or_create(name, lambda: Counter(name, documentation, labelnames))
+
+    def register_stats(self, prefix: str, documentation: str, source: Callable[[], Dict[str, Any]]):
+        """
+        注册一个 stats() 数据源，输出时展开为 gauge
+
+        :param prefix: 指标名前缀
+        :param documentation: 说明
+        :param source: 返回统计字典的函数
+        """
+        with self._lock:
+            self._metrics[prefix] = _StatsCollector(prefix, documentation, source)
+
+    def render(self) -> str:
+        """
+        输出 Prometheus 文本格式
+
+        :return: 指标文本
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+
+registry = MetricsRegistry()
+
+# 上游请求各阶段耗时：connect / tls / ttfb / body_read / json_decode / total
+UPSTREAM_PHASE_SECONDS = registry.histogram(
+    'chongzhi_upstream_phase_seconds',
+    'Upstream HTTP call latency by endpoint and phase',
+    ('endpoint', 'phase'),
+)
+
+# 完整充值流程各步骤耗时
+RECHARGE_STEP_SECONDS = registry.histogram(
+    'chongzhi_recharge_step_seconds',
+    'full_recharge_process step latency',
+    ('step', 'success'),
+)
+
+# 上游调用重试：reason 为 retry / unsent_resend / reconciled / budget_exhausted
+UPSTREAM_RETRIES = registry.counter(
+    'chongzhi_upstream_retries_total',
+    'Upstream call retries and retry decisions by endpoint',
+    ('endpoint', 'reason'),
+)
+
+# 正文超过 UPSTREAM_MAX_RESPONSE_BYTES 被放弃读取的上游响应
+UPSTREAM_OVERSIZED_RESPONSES = registry.counter(
+    'chongzhi_upstream_oversized_responses_total',
+    'Upstream responses abandoned for exceeding the body size limit',
+    ('endpoint',),
+)
+
+# 本地拦截的 JSON Token：reason 为 invalid_json / missing_access_token / expired
+TOKEN_REJECTIONS = registry.counter(
+    'chongzhi_token_rejections_total',
+    'JSON tokens rejected locally before upstream submission',
+    ('reason',),
+)
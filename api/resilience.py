@@ -0,0 +1,402 @@
+"""
+上游容错
+熔断器：按接口统计滚动窗口内的失败率和慢调用率，上游故障时快速失败
+并发限制：超过上限的请求直接拒绝（503），不在已经失效的上游后面排队
+截止时间：多步流程共享一个总时间预算，后续步骤的超时随剩余时间缩短
+重试：指数退避加随机抖动，重试次数受进程级重试预算限制，避免故障时放大流量
+
+配置（环境变量）：
+BREAKER_WINDOW_SECONDS      统计窗口（秒），默认 30
+BREAKER_MIN_CALLS           窗口内最少调用数，达到后才判断是否熔断，默认 10
+BREAKER_FAILURE_RATE        失败率阈值，默认 0.5
+BREAKER_SLOW_CALL_SECONDS   超过该耗时视为慢调用，默认 10
+BREAKER_SLOW_CALL_RATE      慢调用率阈值，默认 0.8
+BREAKER_OPEN_SECONDS        熔断持续时间，之后进入半开状态试探，默认 15
+BREAKER_HALF_OPEN_CALLS     半开状态允许的试探请求数，默认 2
+MAX_CONCURRENT_UPSTREAM_REQUESTS  同时访问上游的最大请求数，默认 64
+RETRY_MAX_ATTEMPTS          单次调用最多尝试次数（含第一次），默认 3
+RETRY_BASE_DELAY            退避基础时间（秒），默认 0.2
+RETRY_MAX_DELAY             单次退避上限（秒），默认 2
+RETRY_BUDGET_RATIO          每个请求为重试预算积累的额度，默认 0.2（重试量约为请求量的20%）
+RETRY_BUDGET_MIN            重试预算的初始额度和上限，默认 10
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, window: float = 30.0, min_calls: int = 10,
+                 failure_rate_threshold: float = 0.5, slow_call_threshold: float = 10.0,
+                 slow_call_rate_threshold: float = 0.8, open_duration: float = 15.0,
+                 half_open_max_calls: int = 2):
+        """
+        构造函数
+        :param name: 名称（上游接口名）
+        :param window: 滚动统计窗口（秒）
+        :param min_calls: 窗口内最少调用数
+        :param failure_rate_threshold: 失败率阈值（0~1）
+        :param slow_call_threshold: 慢调用耗时阈值（秒）
+        :param slow_call_rate_threshold: 慢调用率阈值（0~1）
+        :param open_duration: 熔断持续时间（秒）
+        :param half_open_max_calls: 半开状态试探请求数
+        """
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        # (时间, 是否失败, 是否慢调用)
+        self._calls = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        是否放行本次调用
+        放行后必须调用 record 报告结果（调用被取消时调用 cancel）
+
+        :return: False 表示熔断中，应快速失败
+        """
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def cancel(self):
+        """
+        放行的调用被取消、没有结果（如客户端断开）
+        不计入成功或失败，只归还半开状态的试探名额
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def record(self, success: bool, duration: float):
+        """
+        报告调用结果
+
+        :param success: 调用是否成功（上游可用）
+        :param duration: 调用耗时（秒）
+        """
+        now = time.monotonic()
+        slow = duration >= self.slow_call_threshold
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if not success or slow:
+                    self._trip(now)
+                    return
+                self._half_open_successes += 1
+                if self._half_open_successes >= self.half_open_max_calls:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                return
+
+            self._calls.append((now, not success, slow))
+            self._evict(now)
+            if self._state == self.CLOSED and len(self._calls) >= self.min_calls:
+                total = len(self._calls)
+                failures = sum(1 for _, failed, _ in self._calls if failed)
+                slow_calls = sum(1 for _, _, is_slow in self._calls if is_slow)
+                if (failures / total >= self.failure_rate_threshold
+                        or slow_calls / total >= self.slow_call_rate_threshold):
+                    self._trip(now)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取熔断器状态
+
+        :return: 状态和窗口内统计
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refresh_state(now)
+            self._evict(now)
+            total = len(self._calls)
+            failures = sum(1 for _, failed, _ in self._calls if failed)
+            return {
+                'state': self._state,
+                'open': 1 if self._state == self.OPEN else 0,
+                'window_calls': total,
+                'window_failure_rate': round(failures / total, 4) if total else 0.0,
+                'rejected': self._rejected,
+                'opened': self._opened,
+            }
+
+    def _trip(self, now: float):
+        """进入熔断状态（调用方需持有锁）"""
+        self._state = self.OPEN
+        self._opened_at = now
+        self._opened += 1
+        self._calls.clear()
+
+    def _refresh_state(self, now: float):
+        """熔断时间到期后转为半开（调用方需持有锁）"""
+        if self._state == self.OPEN and now - self._opened_at >= self.open_duration:
+            self._state = self.HALF_OPEN
+            self._half_open_in_flight = 0
+            self._half_open_successes = 0
+
+    def _evict(self, now: float):
+        deadline = now - self.window
+        while self._calls and self._calls[0][0] < deadline:
+            self._calls.popleft()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    获取指定上游接口的熔断器（进程内共享，配置从环境变量读取）
+
+    :param name: 上游接口名
+    :return: CircuitBreaker
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    window=float(os.environ.get('BREAKER_WINDOW_SECONDS', '30')),
+                    min_calls=int(os.environ.get('BREAKER_MIN_CALLS', '10')),
+                    failure_rate_threshold=float(os.environ.get('BREAKER_FAILURE_RATE', '0.5')),
+                    slow_call_threshold=float(os.environ.get('BREAKER_SLOW_CALL_SECONDS', '10')),
+                    slow_call_rate_threshold=float(os.environ.get('BREAKER_SLOW_CALL_RATE', '0.8')),
+                    open_duration=float(os.environ.get('BREAKER_OPEN_SECONDS', '15')),
+                    half_open_max_calls=int(os.environ.get('BREAKER_HALF_OPEN_CALLS', '2')),
+                )
+                _breakers[name] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Any]:
+    """
+    所有熔断器的状态
+
+    :return: 接口名 -> 状态
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrent: int):
+        """
+        构造函数
+        :param max_concurrent: 最大并发数，0 表示不限制
+        """
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._shed = 0
+
+    def _weight(self, slots: int) -> int:
+        # 占用名额超过上限的请求按上限计算，否则永远无法获得名额
+        return min(slots, self.max_concurrent) if self.max_concurrent else slots
+
+    def try_acquire(self, slots: int = 1) -> bool:
+        """
+        尝试占用并发名额，不等待
+
+        :param slots: 占用的名额数（会并发访问上游多次的请求占用多个）
+        :return: False 表示已满，应直接拒绝
+        """
+        slots = self._weight(slots)
+        with self._lock:
+            if self.max_concurrent and self._in_flight + slots > self.max_concurrent:
+                self._shed += 1
+                return False
+            self._in_flight += slots
+            return True
+
+    def release(self, slots: int = 1):
+        """
+        归还并发名额
+
+        :param slots: 与 try_acquire 相同的名额数
+        """
+        slots = self._weight(slots)
+        with self._lock:
+            self._in_flight -= slots
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self._in_flight,
+                'shed': self._shed,
+            }
+
+
+def create_limiter_from_env() -> ConcurrencyLimiter:
+    """根据环境变量创建并发限制器"""
+    return ConcurrencyLimiter(int(os.environ.get('MAX_CONCURRENT_UPSTREAM_REQUESTS', '64')))
+
+
+class Deadline:
+    """
+    总时间预算
+    在多个上游调用之间传递，每一步的超时不超过剩余时间
+    """
+
+    def __init__(self, budget: float):
+        """
+        构造函数
+        :param budget: 总时间预算（秒）
+        """
+        self.budget = budget
+        self._expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """
+        剩余时间
+
+        :return: 剩余秒数，已到期返回 0
+        """
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def clamp(self, timeout: float) -> float:
+        """
+        把单次超时限制在剩余时间以内
+
+        :param timeout: 原超时（秒）
+        :return: 不超过剩余时间的超时
+        """
+        return min(timeout, self.remaining())
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0):
+        """
+        构造函数
+        :param max_attempts: 最多尝试次数（含第一次）
+        :param base_delay: 退避基础时间（秒）
+        :param max_delay: 单次退避上限（秒）
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """
+        第 attempt 次失败后的等待时间（指数退避，全量随机抖动）
+
+        :param attempt: 已失败次数（从1开始）
+        :return: 等待秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class RetryBudget:
+    """
+    进程级重试预算
+    每个请求积累 ratio 个额度，每次重试消耗 1 个；上游大面积故障时额度很快耗尽，重试自动停止
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0):
+        """
+        构造函数
+        :param ratio: 每个请求积累的额度
+        :param min_tokens: 初始额度，同时作为额度上限
+        """
+        self.ratio = ratio
+        self.max_tokens = min_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._exhausted = 0
+
+    def deposit(self):
+        """记录一个新请求"""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        尝试消耗一次重试额度
+
+        :return: False 表示预算已用尽，不应重试
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._retries += 1
+                return True
+            self._exhausted += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'tokens': round(self._tokens, 2),
+                'retries': self._retries,
+                'exhausted': self._exhausted,
+            }
+
+
+_retry_budget = None
+_retry_budget_lock = threading.Lock()
+
+
+def get_retry_budget() -> RetryBudget:
+    """
+    获取进程内共享的重试预算（配置从环境变量读取）
+
+    :return: RetryBudget
+    """
+    global _retry_budget
+    if _retry_budget is None:
+        with _retry_budget_lock:
+            if _retry_budget is None:
+                _retry_budget = RetryBudget(
+                    ratio=float(os.environ.get('RETRY_BUDGET_RATIO', '0.2')),
+                    min_tokens=float(os.environ.get('RETRY_BUDGET_MIN', '10')),
+                )
+    return _retry_budget
+
+
+def create_retry_policy_from_env() -> RetryPolicy:
+    """根据环境变量创建重试策略"""
+    return RetryPolicy(
+        max_attempts=int(os.environ.get('RETRY_MAX_ATTEMPTS', '3')),
+        base_delay=float(os.environ.get('RETRY_BASE_DELAY', '0.2')),
+        max_delay=float(os.environ.get('RETRY_MAX_DELAY', '2')),
+    )
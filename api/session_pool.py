@@ -0,0 +1,180 @@
+"""
+上游Session预热池
+后台线程预先获取 ios_gpt_session，验证激活码时直接取用，
+把 get_session 这次主页请求移出用户请求的关键路径。
+
+配置（环境变量）：
+SESSION_POOL_SIZE             池目标大小，默认 2，设为 0 关闭预热
+SESSION_POOL_TTL              Session 最长存活秒数（从获取时算起），超过后丢弃，默认 300；
+                              池中的Session取出后不再放回，在池中时从未使用过，只按存活时间淘汰
+SESSION_POOL_REFILL_INTERVAL  后台补充检查间隔（秒），默认 30
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+from api_client import ChongzhiProApiClient, UpstreamSession, SESSION_REJECTED_HTTP_CODES as REJECTED_HTTP_CODES
+from resilience import Deadline
+
+
+class UpstreamSessionPool:
+    def __init__(self, client_factory: Callable[[], ChongzhiProApiClient] = ChongzhiProApiClient,
+                 target_size: int = 2, ttl: float = 300.0, refill_interval: float = 30.0):
+        """
+        构造函数
+        :param client_factory: 创建API客户端的工厂函数
+        :param target_size: 池目标大小，0 表示不预热
+        :param ttl: Session 最长存活时间（秒）
+        :param refill_interval: 后台补充检查间隔（秒）
+        """
+        self.client_factory = client_factory
+        self.target_size = target_size
+        self.ttl = ttl
+        self.refill_interval = refill_interval
+
+        # UpstreamSession，左侧最旧，右侧最新
+        self._sessions = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+        self._rejected = 0
+        self._refill_failures = 0
+
+    def acquire(self, deadline: Deadline = None) -> Optional[UpstreamSession]:
+        """
+        取出一个可用Session
+        优先使用池中最新的Session，池为空时同步调用 get_session
+
+        :param deadline: 可选，总时间预算，同步获取Session（含重试）不超过剩余时间
+        :return: UpstreamSession 或 None（失败时）
+        """
+        self._ensure_started()
+
+        session_id = None
+        with self._lock:
+            self._evict_expired()
+            if self._sessions:
+                session_id = self._sessions.pop()
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        # 通知后台线程补充
+        self._wakeup.set()
+
+        if session_id:
+            return session_id
+        return self.client_factory().get_session(deadline=deadline)
+
+    def reject(self, session_id: str):
+        """
+        标记Session被上游拒绝
+        池中其余Session都比它更早获取，同样不可信，一并丢弃
+
+        :param session_id: 被拒绝的Session ID
+        """
+        with self._lock:
+            self._rejected += 1
+            self._evicted += len(self._sessions)
+            self._sessions.clear()
+        self._wakeup.set()
+
+    @staticmethod
+    def is_rejection(result: Dict[str, Any]) -> bool:
+        """
+        判断上游结果是否表示Session失效
+
+        :param result: 上游返回结果
+        :return: 是否为Session失效
+        """
+        return result.get('http_code') in REJECTED_HTTP_CODES
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取预热池统计信息
+
+        :return: 统计信息
+        """
+        with self._lock:
+            return {
+                'size': len(self._sessions),
+                'oldest_age': round(self._sessions[0].age, 1) if self._sessions else 0.0,
+                'target_size': self.target_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evicted': self._evicted,
+                'rejected': self._rejected,
+                'refill_failures': self._refill_failures,
+            }
+
+    def stop(self):
+        """停止后台补充线程"""
+        self._stopped = True
+        self._wakeup.set()
+
+    def _ensure_started(self):
+        """首次使用时启动后台补充线程"""
+        if self.target_size <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._refill_loop,
+                    name='upstream-session-pool',
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _evict_expired(self):
+        """丢弃超过最长存活时间的Session（调用方需持有锁）"""
+        deadline = time.monotonic() - self.ttl
+        while self._sessions and self._sessions[0].created_at < deadline:
+            self._sessions.popleft()
+            self._evicted += 1
+
+    def _refill_loop(self):
+        """后台线程：把池补充到目标大小"""
+        while not self._stopped:
+            self._wakeup.clear()
+            self._refill()
+            self._wakeup.wait(self.refill_interval)
+
+    def _refill(self):
+        client = self.client_factory()
+        while not self._stopped:
+            with self._lock:
+                self._evict_expired()
+                if len(self._sessions) >= self.target_size:
+                    return
+
+            session_id = client.get_session()
+            if not session_id:
+                with self._lock:
+                    self._refill_failures += 1
+                return
+
+            if not isinstance(session_id, UpstreamSession):
+                session_id = UpstreamSession(session_id)
+            with self._lock:
+                self._sessions.append(session_id)
+
+
+def create_session_pool_from_env() -> UpstreamSessionPool:
+    """
+    根据环境变量创建预热池
+
+    :return: UpstreamSessionPool
+    """
+    return UpstreamSessionPool(
+        target_size=int(os.environ.get('SESSION_POOL_SIZE', '2')),
+        ttl=float(os.environ.get('SESSION_POOL_TTL', '300')),
+        refill_interval=float(os.environ.get('SESSION_POOL_REFILL_INTERVAL', '30')),
+    )
@@ -0,0 +1,204 @@
+"""
+服务端会话存储
+Cookie 中只保存随机会话ID，会话数据保存在服务端，
+避免每个请求都上传、校验签名并反序列化整个会话。
+
+配置（环境变量）：
+SESSION_BACKEND      cookie（默认，Flask签名Cookie）/ memory（进程内LRU）/ sqlite（多进程共享）
+SESSION_MAX_ENTRIES  memory 后端最多保存的会话数，默认 10000
+SESSION_SQLITE_PATH  sqlite 后端数据库文件，默认 /tmp/gpt_recharge_sessions.sqlite3
+
+注意：Vercel 等多实例部署中，memory/sqlite 会话只在单个实例内有效，此时应保持 cookie 后端。
+"""
+
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+# 会话ID格式：secrets.token_urlsafe(32)
+_SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+class MemorySessionStore:
+    def __init__(self, max_entries: int = 10000):
+        """
+        构造函数
+        :param max_entries: 最多保存的会话数，超过后淘汰最久未使用的
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # sid -> (过期时间, 数据)
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        """
+        读取会话
+
+        :param sid: 会话ID
+        :return: 会话数据，不存在或已过期返回 None
+        """
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return dict(entry[1])
+
+    def save(self, sid: str, data: Dict[str, Any], ttl: float):
+        """
+        保存会话
+
+        :param sid: 会话ID
+        :param data: 会话数据
+        :param ttl: 有效期（秒）
+        """
+        with self._lock:
+            self._data[sid] = (time.time() + ttl, dict(data))
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    def __init__(self, path: str):
+        """
+        构造函数
+        :param path: 数据库文件路径，同一台机器上的多个进程可共享
+        """
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires)')
+
+    def _connect(self) -> 'sqlite3.Connection':
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 只有 sqlite 后端用到，延迟导入以免拖慢其他后端的冷启动
+            import sqlite3
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            'SELECT data FROM sessions WHERE sid = ? AND expires >= ?', (sid, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def save(self, sid: str, data: Dict[str, Any], ttl: float):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)',
+                (sid, json.dumps(data, ensure_ascii=False, separators=(',', ':')), now + ttl),
+            )
+            # 定期清理过期会话
+            self._writes += 1
+            if self._writes % 500 == 0:
+                conn.execute('DELETE FROM sessions WHERE expires < ?', (now,))
+
+    def delete(self, sid: str):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial: Dict[str, Any] = None, sid: str = None, new: bool = False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSideSessionInterface(SessionInterface):
+    def __init__(self, store, ttl: float):
+        """
+        构造函数
+        :param store: 会话存储（MemorySessionStore / SQLiteSessionStore）
+        :param ttl: 会话有效期（秒），对应 SESSION_TIMEOUT
+        """
+        self.store = store
+        self.ttl = ttl
+
+    def open_session(self, app, request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_PATTERN.match(sid):
+            data = self.store.load(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session: ServerSideSession, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # 有修改时写入；永久会话按 SESSION_REFRESH_EACH_REQUEST 续期
+        if self.should_set_cookie(app, session):
+            self.store.save(session.sid, dict(session), self.ttl)
+
+        # Cookie 只在会话ID新建时下发一次
+        if session.new:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def create_session_interface(backend: str, ttl: float) -> Optional[ServerSideSessionInterface]:
+    """
+    根据后端名称创建会话接口
+
+    :param backend: cookie / memory / sqlite
+    :param ttl: 会话有效期（秒）
+    :return: 会话接口，cookie 后端返回 None（沿用Flask默认实现）
+    """
+    if backend == 'memory':
+        store = MemorySessionStore(int(os.environ.get('SESSION_MAX_ENTRIES', '10000')))
+    elif backend == 'sqlite':
+        store = SQLiteSessionStore(os.environ.get('SESSION_SQLITE_PATH', '/tmp/gpt_recharge_sessions.sqlite3'))
+    elif backend == 'cookie':
+        return None
+    else:
+        raise ValueError(f'不支持的会话后端: {backend}')
+    return ServerSideSessionInterface(store, ttl)
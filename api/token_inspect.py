@@ -0,0 +1,82 @@
+"""
+JSON Token 本地预检
+提交充值前先在本地解析用户粘贴的 JSON Token：
+- 不是 JSON 对象、没有 accessToken 的直接拒绝
+- 离线解码 accessToken（JWT）的 exp，已过期的直接拒绝，不再请求上游
+- 去掉 WARNING_BANNER 和值为 null 的顶层字段，紧凑序列化后再提交，减小请求体
+
+accessToken 不是 JWT 或没有 exp 时不做过期判断，交给上游处理。
+"""
+
+import base64
+import binascii
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import json_codec
+from metrics import TOKEN_REJECTIONS
+
+# ChatGPT 会话 JSON 中存放 access token 的字段
+ACCESS_TOKEN_FIELDS = ('accessToken', 'access_token')
+
+# 上游不使用、只会增大请求体的顶层字段
+UNUSED_FIELDS = ('WARNING_BANNER',)
+
+INVALID_JSON_ERROR = 'JSON Token格式不正确，请复制完整的JSON内容（以 { 开头、以 } 结尾）'
+MISSING_ACCESS_TOKEN_ERROR = 'JSON Token中没有accessToken，请重新登录ChatGPT后复制完整的JSON'
+EXPIRED_ERROR = 'Token已过期，请重新登录ChatGPT获取新Token重试，不要换卡密'
+
+
+def token_expiry(access_token: str) -> Optional[float]:
+    """
+    离线读取 JWT 的过期时间（不校验签名）
+
+    :param access_token: accessToken
+    :return: exp（Unix 时间戳），不是 JWT 或没有 exp 时返回 None
+    """
+    parts = access_token.split('.')
+    if len(parts) != 3:
+        return None
+    payload = parts[1]
+    try:
+        claims = json_codec.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(claims, dict):
+        return None
+    exp = claims.get('exp')
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        return None
+    return float(exp)
+
+
+def inspect_json_token(json_token: str, now: float = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    预检并压缩 JSON Token
+
+    :param json_token: 用户粘贴的 JSON Token
+    :param now: 可选，当前时间（Unix 时间戳），默认 time.time()
+    :return: (压缩后的 JSON Token, 错误信息)；预检通过时错误信息为 None
+    """
+    try:
+        data = json_codec.loads(json_token)
+    except json_codec.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        TOKEN_REJECTIONS.inc('invalid_json')
+        return None, INVALID_JSON_ERROR
+
+    access_token = next((data[field] for field in ACCESS_TOKEN_FIELDS
+                         if isinstance(data.get(field), str) and data[field].strip()), None)
+    if access_token is None:
+        TOKEN_REJECTIONS.inc('missing_access_token')
+        return None, MISSING_ACCESS_TOKEN_ERROR
+
+    exp = token_expiry(access_token.strip())
+    if exp is not None and exp <= (time.time() if now is None else now):
+        TOKEN_REJECTIONS.inc('expired')
+        return None, EXPIRED_ERROR
+
+    compact: Dict[str, Any] = {key: value for key, value in data.items()
+                               if value is not None and key not in UNUSED_FIELDS}
+    return json_codec.dumps(compact), None
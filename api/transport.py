@@ -0,0 +1,253 @@
+"""
+上游HTTP传输层
+进程级共享的连接池，所有 ChongzhiProApiClient 实例复用同一组 TCP/TLS 连接，
+避免每次请求都重新握手。
+
+配置（环境变量）：
+UPSTREAM_POOL_SIZE      每个主机的最大连接数，默认 20
+UPSTREAM_KEEP_ALIVE     是否保持长连接，默认 1
+UPSTREAM_MAX_IDLE_TIME  连接池最大空闲秒数，超过后丢弃全部连接重新建立，默认 60
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Any, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import connection, connectionpool
+
+
+# 当前线程正在采集的阶段耗时（秒），由 capture_phases 设置
+_phase_local = threading.local()
+
+
+@contextmanager
+def capture_phases() -> Iterator[Dict[str, float]]:
+    """
+    采集代码块内上游请求的建连耗时
+    connect 为 DNS 解析 + TCP 建连，tls 为 TLS 握手；复用连接时两者都不出现
+
+    :return: 阶段 -> 秒 的字典，代码块结束后填充完毕
+    """
+    timings: Dict[str, float] = {}
+    previous = getattr(_phase_local, 'timings', None)
+    _phase_local.timings = timings
+    try:
+        yield timings
+    finally:
+        _phase_local.timings = previous
+
+
+def _record_phase(phase: str, seconds: float):
+    timings = getattr(_phase_local, 'timings', None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+class HTTPConnection(connection.HTTPConnection):
+    """记录建连耗时；沿用urllib3的类名，错误信息与默认连接保持一致"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _record_phase('connect', time.perf_counter() - start)
+
+
+class HTTPSConnection(connection.HTTPSConnection):
+    """记录建连与TLS握手耗时"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _record_phase('connect', time.perf_counter() - start)
+
+    def connect(self):
+        # HTTPS 的 connect 包含 _new_conn（TCP）和 TLS 握手，差值即握手耗时
+        timings = getattr(_phase_local, 'timings', None)
+        connect_before = timings.get('connect', 0.0) if timings is not None else 0.0
+        start = time.perf_counter()
+        super().connect()
+        if timings is not None:
+            tcp = timings.get('connect', 0.0) - connect_before
+            _record_phase('tls', max(0.0, time.perf_counter() - start - tcp))
+
+
+class _BlockAllCookies(DefaultCookiePolicy):
+    """共享Session不保存任何Cookie，避免不同用户的上游会话互相串用"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+class PooledTransport:
+    def __init__(self, pool_size: int = 20, keep_alive: bool = True,
+                 max_idle_time: float = 60.0, verify: bool = False):
+        """
+        构造函数
+        :param pool_size: 每个主机的最大连接数
+        :param keep_alive: 是否保持长连接
+        :param max_idle_time: 最大空闲时间（秒），超过后重建连接池
+        :param verify: 是否校验SSL证书
+        """
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.max_idle_time = max_idle_time
+        self.verify = verify
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._misses = 0
+        self._recycles = 0
+        self._last_used = time.monotonic()
+
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """创建带计数连接池的 requests.Session"""
+        session = requests.Session()
+        session.verify = self.verify
+        session.cookies.set_policy(_BlockAllCookies())
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+
+        adapter = _CountingAdapter(
+            self,
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=0,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _record_new_connection(self):
+        with self._lock:
+            self._misses += 1
+
+    def _before_request(self):
+        """请求前检查空闲时间，必要时丢弃失效的连接"""
+        now = time.monotonic()
+        with self._lock:
+            self._requests += 1
+            idle = now - self._last_used
+            self._last_used = now
+            if self.max_idle_time and idle > self.max_idle_time:
+                self._recycles += 1
+                recycle = True
+            else:
+                recycle = False
+
+        if recycle:
+            for adapter in self.session.adapters.values():
+                adapter.close()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求
+
+        :param method: 请求方法
+        :param url: 请求URL
+        :return: requests.Response
+        """
+        self._before_request()
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                self._last_used = time.monotonic()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取连接池统计信息
+
+        :return: 请求数、命中（复用连接）数、未命中（新建连接）数、命中率
+        """
+        with self._lock:
+            total = self._requests
+            misses = min(self._misses, total)
+            recycles = self._recycles
+        hits = total - misses
+        return {
+            'requests': total,
+            'pool_hits': hits,
+            'pool_misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'recycles': recycles,
+            'pool_size': self.pool_size,
+        }
+
+    def close(self):
+        """关闭全部连接"""
+        self.session.close()
+
+
+class _CountingAdapter(HTTPAdapter):
+    """新建连接时通知 PooledTransport 计数，并记录建连耗时"""
+
+    def __init__(self, transport: PooledTransport, **kwargs):
+        self._transport = transport
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        transport = self._transport
+
+        # 沿用urllib3的类名，错误信息与默认连接池保持一致
+        class HTTPConnectionPool(connectionpool.HTTPConnectionPool):
+            ConnectionCls = HTTPConnection
+
+            def _new_conn(self):
+                transport._record_new_connection()
+                return super()._new_conn()
+
+        class HTTPSConnectionPool(connectionpool.HTTPSConnectionPool):
+            ConnectionCls = HTTPSConnection
+
+            def _new_conn(self):
+                transport._record_new_connection()
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': HTTPConnectionPool,
+            'https': HTTPSConnectionPool,
+        }
+
+
+_shared_transport: Optional[PooledTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport() -> PooledTransport:
+    """
+    获取进程级共享的传输层实例
+    Serverless热启动期间一直复用，配置从环境变量读取
+
+    :return: PooledTransport
+    """
+    global _shared_transport
+    if _shared_transport is None:
+        with _shared_lock:
+            if _shared_transport is None:
+                _shared_transport = PooledTransport(
+                    pool_size=int(os.environ.get('UPSTREAM_POOL_SIZE', '20')),
+                    keep_alive=os.environ.get('UPSTREAM_KEEP_ALIVE', '1') not in ('0', 'false', 'False'),
+                    max_idle_time=float(os.environ.get('UPSTREAM_MAX_IDLE_TIME', '60')),
+                )
+    return _shared_transport
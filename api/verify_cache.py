@@ -0,0 +1,155 @@
+"""
+激活码验证结果缓存
+同一激活码短时间内重复验证时直接返回上次的上游结果，减少重试高峰时的验证请求。
+
+缓存策略：
+active 状态     VERIFY_CACHE_ACTIVE_TTL 秒（默认 30），充值后状态会变化，时间较短
+used 状态       VERIFY_CACHE_USED_TTL 秒（默认 120）
+激活码无效    VERIFY_CACHE_NEGATIVE_TTL 秒（默认 60），上游JSON返回 success: false 且错误信息命中
+                error_mappings.INVALID_CODE_KEYWORDS（激活码不存在、无效等），其他业务拒绝不缓存
+网络错误、HTTP错误、非JSON响应、响应过大等暂时性失败不缓存；充值或更新Token后需调用 invalidate
+验证成功的结果绑定验证时使用的上游会话：get_for_session 只把它返回给同一个会话，其他浏览器需要重新验证
+VERIFY_CACHE_SIZE 为最多缓存的激活码数量（默认 10000，0 表示关闭缓存）
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from error_mappings import is_invalid_code_error
+
+
+class VerifyResultCache:
+    def __init__(self, max_entries: int = 10000, active_ttl: float = 30.0, used_ttl: float = 120.0,
+                 negative_ttl: float = 60.0):
+        """
+        构造函数
+        :param max_entries: 最多缓存的激活码数量，超过后淘汰最久未使用的，0 表示关闭
+        :param active_ttl: active 状态结果的有效期（秒）
+        :param used_ttl: used 状态结果的有效期（秒）
+        :param negative_ttl: 上游明确拒绝结果的有效期（秒）
+        """
+        self.max_entries = max_entries
+        self.active_ttl = active_ttl
+        self.used_ttl = used_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        # 激活码 -> (过期时间, Session ID, 验证结果)
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _ttl_for(self, verify_result: Dict[str, Any]) -> float:
+        """
+        根据验证结果决定缓存时间
+
+        :param verify_result: 验证结果
+        :return: 有效期（秒），0 表示不缓存
+        """
+        if verify_result.get('success', False):
+            code_status = verify_result.get('data', {}).get('code_status', '')
+            if code_status == 'active':
+                return self.active_ttl
+            if code_status == 'used':
+                return self.used_ttl
+            return 0
+        # 只缓存上游JSON明确返回 success: false、且错误信息表示激活码无效（不存在、输错）的结果；
+        # 限流、"请重试"、会话失效等其他拒绝，以及网络错误、熔断、HTTP错误、非JSON页面、过大的响应都可能很快恢复
+        if (verify_result.get('http_code') in (200, 201)
+                and 'success' in verify_result
+                and 'raw_response' not in verify_result
+                and not verify_result.get('response_too_large')
+                and is_invalid_code_error(str(verify_result.get('error') or verify_result.get('message') or ''))):
+            return self.negative_ttl
+        return 0
+
+    def get(self, code: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        读取缓存（只使用验证结果，如批量验证）
+
+        :param code: 规范化后的激活码
+        :return: (Session ID, 验证结果)，未命中返回 None
+        """
+        return self._lookup(code, None, False)
+
+    def get_for_session(self, code: str, session_id: Optional[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        读取缓存，验证成功的结果只返回给验证时使用的同一个上游会话
+        上游按会话记录已验证的激活码，之后的充值/复用必须使用该会话；
+        其他浏览器命中时返回 None，由它用自己的会话重新验证，不同用户不会共用一个上游会话
+
+        :param code: 规范化后的激活码
+        :param session_id: 调用方自己的 Session ID（没有时为 None）
+        :return: (Session ID, 验证结果)，未命中返回 None
+        """
+        return self._lookup(code, session_id, True)
+
+    def _lookup(self, code: str, session_id: Optional[str], bound: bool) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._data.get(code)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[code]
+                self._misses += 1
+                return None
+            if bound and entry[2].get('success', False) and entry[1] != session_id:
+                self._misses += 1
+                return None
+            self._data.move_to_end(code)
+            self._hits += 1
+            if not entry[2].get('success', False):
+                self._negative_hits += 1
+            return entry[1], entry[2]
+
+    def put(self, code: str, session_id: str, verify_result: Dict[str, Any]):
+        """
+        写入缓存（不可缓存的结果会被忽略）
+
+        :param code: 规范化后的激活码
+        :param session_id: 验证时使用的 Session ID
+        :param verify_result: 验证结果
+        """
+        if not self.max_entries:
+            return
+        ttl = self._ttl_for(verify_result)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[code] = (time.monotonic() + ttl, session_id, verify_result)
+            self._data.move_to_end(code)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, code: str):
+        """
+        删除缓存（充值、更新Token后激活码状态可能已变化）
+
+        :param code: 规范化后的激活码
+        """
+        with self._lock:
+            if self._data.pop(code, None) is not None:
+                self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': self._hits,
+                'negative_hits': self._negative_hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+            }
+
+
+def create_verify_cache_from_env() -> VerifyResultCache:
+    """根据环境变量创建验证结果缓存"""
+    return VerifyResultCache(
+        max_entries=int(os.environ.get('VERIFY_CACHE_SIZE', '10000')),
+        active_ttl=float(os.environ.get('VERIFY_CACHE_ACTIVE_TTL', '30')),
+        used_ttl=float(os.environ.get('VERIFY_CACHE_USED_TTL', '120')),
+        negative_ttl=float(os.environ.get('VERIFY_CACHE_NEGATIVE_TTL', '60')),
+    )
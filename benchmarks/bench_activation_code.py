@@ -0,0 +1,125 @@
+"""
+激活码校验微基准
+用大量合成激活码（规范格式、小写、带空格、全角字符、各种破折号、格式错误）对比
+旧实现（每次 re.match 原始正则 + IGNORECASE，再 upper() 作为缓存键）与 activation_code.parse_activation_code。
+不发出网络请求。
+
+示例：
+python benchmarks/bench_activation_code.py
+python benchmarks/bench_activation_code.py --codes 5000000 --json
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+import harness  # noqa: F401  把 api/ 加入 sys.path
+from activation_code import parse_activation_code
+
+ALPHABET = string.ascii_uppercase + string.digits
+FULLWIDTH = str.maketrans({c: chr(ord(c) + 0xFEE0) for c in ALPHABET})
+
+# 各类输入的占比（总和为 1）
+MIX = {
+    'canonical': 0.70,
+    'lowercase': 0.10,
+    'spaces': 0.07,
+    'fullwidth': 0.05,
+    'dashes': 0.05,
+    'invalid': 0.03,
+}
+
+
+def legacy_parse(code: str) -> Optional[str]:
+    """旧实现：去除首尾空白后用原始正则字符串匹配，缓存键为 upper()"""
+    code = code.strip()
+    pattern = r'^(?:[A-Z]+-)?[A-Z0-9]{4}(?:-[A-Z0-9]{4}){2,3}$'
+    if not re.match(pattern, code, re.IGNORECASE):
+        return None
+    return code.upper()
+
+
+def synthetic_codes(count: int, distinct: int, seed: int) -> List[str]:
+    """
+    生成合成激活码：先生成 distinct 个规范激活码，再按 MIX 的占比变形
+
+    :param count: 生成数量
+    :param distinct: 不同激活码的数量
+    :param seed: 随机种子
+    :return: 激活码列表
+    """
+    rng = random.Random(seed)
+    base = []
+    for _ in range(distinct):
+        segments = [''.join(rng.choices(ALPHABET, k=4)) for _ in range(rng.choice((3, 4)))]
+        prefix = ['CARD-', 'VIP-', ''][rng.randrange(3)]
+        base.append(prefix + '-'.join(segments))
+
+    kinds, weights = list(MIX), list(MIX.values())
+    codes = []
+    for kind in rng.choices(kinds, weights, k=count):
+        code = base[rng.randrange(distinct)]
+        if kind == 'lowercase':
+            code = code.lower()
+        elif kind == 'spaces':
+            code = f'  {code.replace("-", " - ", 1)}\t'
+        elif kind == 'fullwidth':
+            code = code.translate(FULLWIDTH)
+        elif kind == 'dashes':
+            code = code.replace('-', rng.choice('－—–'))
+        elif kind == 'invalid':
+            code = code[:-1] + '!'
+        codes.append(code)
+    return codes
+
+
+def run(parse: Callable[[str], Optional[str]], codes: List[str]) -> Dict[str, Any]:
+    """
+    校验全部激活码
+
+    :return: 耗时、吞吐量、有效数量和不同缓存键的数量
+    """
+    start = time.perf_counter()
+    keys = [parse(code) for code in codes]
+    elapsed = time.perf_counter() - start
+    valid = [key for key in keys if key is not None]
+    return {
+        'seconds': round(elapsed, 3),
+        'codes_per_second': round(len(codes) / elapsed),
+        'ns_per_code': round(elapsed / len(codes) * 1e9, 1),
+        'valid': len(valid),
+        'distinct_keys': len(set(valid)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='激活码校验微基准')
+    parser.add_argument('--codes', type=int, default=2000000, help='合成激活码数量')
+    parser.add_argument('--distinct', type=int, default=100000, help='不同激活码数量')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+
+    codes = synthetic_codes(args.codes, args.distinct, args.seed)
+    results = {
+        'legacy (re.match + upper)': run(legacy_parse, codes),
+        'parse_activation_code': run(parse_activation_code, codes),
+    }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    baseline = results['legacy (re.match + upper)']['ns_per_code']
+    print(f'{args.codes} codes, {args.distinct} distinct')
+    for name, result in results.items():
+        print(f"{name:26s} {result['ns_per_code']:7.1f} ns/code  x{baseline / result['ns_per_code']:.2f}  "
+              f"valid {result['valid']}  distinct keys {result['distinct_keys']}")
+
+
+if __name__ == '__main__':
+    main()
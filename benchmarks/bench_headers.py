@@ -0,0 +1,78 @@
+"""
+请求构建微基准
+对比逐次构建请求头（旧实现）与预先构建的请求头模板，输出每次调用的耗时和内存分配。
+不发出网络请求。
+
+示例：
+python benchmarks/bench_headers.py
+python benchmarks/bench_headers.py --calls 200000 --json
+"""
+
+import argparse
+import json
+from urllib.parse import urlparse
+
+from harness import allocations_per_call, time_per_call  # harness 同时把 api/ 加入 sys.path
+from api_client import ChongzhiProApiClient
+
+
+def legacy_verify_request(client: ChongzhiProApiClient, session: str, activation_code: str):
+    """旧实现：每次调用都重新解析URL、格式化字符串并构建完整请求头"""
+    url = f"{client.base_url}/api-verify.php"
+
+    payload = {
+        'activation_code': activation_code
+    }
+
+    headers = {
+        'User-Agent': client.user_agent,
+        'Accept': 'application/json',
+        'Referer': f"{client.base_url}/",
+        'Content-Type': 'application/json',
+        'Origin': client.base_url,
+        'Host': urlparse(client.base_url).netloc,
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept-Language': 'zh-CN,zh-Hans;q=0.9',
+        'Cookie': f'ios_gpt_session={session}',
+    }
+
+    return url, payload, headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='请求头构建微基准')
+    parser.add_argument('--calls', type=int, default=100000, help='每轮调用次数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+
+    client = ChongzhiProApiClient('https://chongzhi.pro')
+    session, code = 'a' * 40, 'CARD-QWER-XDKO-DWJN'
+    variants = {
+        'legacy (rebuild per call)': lambda: legacy_verify_request(client, session, code),
+        'template (cookie per call)': lambda: client._verify_request(session, code),
+    }
+
+    # 两种实现的输出必须完全一致（包括请求头顺序）
+    legacy, current = variants['legacy (rebuild per call)'](), variants['template (cookie per call)']()
+    assert legacy == current and list(legacy[2]) == list(current[2]), '请求构建结果不一致'
+
+    results = {}
+    for name, operation in variants.items():
+        results[name] = {
+            'ns_per_call': round(time_per_call(operation, args.calls), 1),
+            **allocations_per_call(operation, min(args.calls, 10000)),
+        }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    baseline = results['legacy (rebuild per call)']['ns_per_call']
+    for name, result in results.items():
+        print(f"{name:28s} {result['ns_per_call']:8.1f} ns/call  "
+              f"x{baseline / result['ns_per_call']:.2f}  "
+              f"peak {result['peak_bytes_per_call']} B  retained {result['retained_bytes_per_call']} B")
+
+
+if __name__ == '__main__':
+    main()
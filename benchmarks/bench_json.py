@@ -0,0 +1,97 @@
+"""
+JSON 编解码微基准
+用典型的上游响应和日志记录，对比标准库（先解码成文本再解析，即 response.json() 的做法）与 json_codec。
+不发出网络请求。JSON_BACKEND=json 时 json_codec 使用标准库，可用于测量回退路径。
+
+示例：
+python benchmarks/bench_json.py
+python benchmarks/bench_json.py --calls 50000 --json
+JSON_BACKEND=json python benchmarks/bench_json.py
+"""
+
+import argparse
+import json
+
+from harness import allocations_per_call, time_per_call  # harness 同时把 api/ 加入 sys.path
+import json_codec
+
+# 上游接口的典型响应
+UPSTREAM_PAYLOADS = {
+    'verify_active': {'success': True, 'data': {'code_status': 'active', 'existing_record': {}}},
+    'verify_used': {
+        'success': True,
+        'data': {
+            'code_status': 'used',
+            'existing_record': {
+                'bound_email_masked': 'te***@example.com',
+                'recharge_time': '2024-05-01 12:30:45',
+                'plan': 'ChatGPT Plus',
+                'expires_at': '2024-06-01 12:30:45',
+            },
+        },
+    },
+    'recharge_ok': {'success': True, 'message': '充值成功', 'data': {'order_id': 'R202405011230450001'}},
+    'recharge_error': {
+        'success': False,
+        'message': 'Token 已过期，请重新获取',
+        'error': 'token_expired',
+        'detail': '账户信息校验失败：' + 'x' * 2048,
+    },
+}
+
+# 每次接口调用写入的日志记录（log_api_call）
+LOG_RECORD = {
+    'timestamp': '2024-05-01T12:30:45.123456',
+    'action': 'verify_code',
+    'success': True,
+    'client_ip': '203.0.113.7',
+    'data': {'activation_code': 'CARD-QWER-XDKO-DWJN', 'status': 'active', 'email': 'te***@example.com'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 编解码微基准')
+    parser.add_argument('--calls', type=int, default=20000, help='每轮调用次数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+
+    cases = {}
+    for name, payload in UPSTREAM_PAYLOADS.items():
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        # 解析结果必须一致
+        assert json_codec.loads(body) == json.loads(body.decode('utf-8')), f'{name} 解析结果不一致'
+        cases[f'decode {name} ({len(body)} B)'] = {
+            'stdlib': lambda body=body: json.loads(body.decode('utf-8')),
+            'codec': lambda body=body: json_codec.loads(body),
+        }
+    assert json.loads(json_codec.dumps(LOG_RECORD)) == LOG_RECORD, '日志记录序列化结果不一致'
+    cases['encode log record'] = {
+        'stdlib': lambda: json.dumps(LOG_RECORD, ensure_ascii=False),
+        'codec': lambda: json_codec.dumps(LOG_RECORD),
+    }
+
+    results = {}
+    for case, variants in cases.items():
+        results[case] = {}
+        for name, operation in variants.items():
+            results[case][name] = {
+                'ns_per_call': round(time_per_call(operation, args.calls), 1),
+                **allocations_per_call(operation, min(args.calls, 10000)),
+            }
+
+    if args.json:
+        print(json.dumps({'backend': json_codec.BACKEND, 'results': results}, ensure_ascii=False, indent=2))
+        return
+
+    print(f'json_codec backend: {json_codec.BACKEND}')
+    for case, variants in results.items():
+        baseline = variants['stdlib']['ns_per_call']
+        print(f'== {case} ==')
+        for name, result in variants.items():
+            print(f"  {name:8s} {result['ns_per_call']:9.1f} ns/call  "
+                  f"x{baseline / result['ns_per_call']:.2f}  "
+                  f"peak {result['peak_bytes_per_call']} B  retained {result['retained_bytes_per_call']} B")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+冷启动基准
+在新的子进程中导入 api/index.py 并处理第一个请求（主页），分别测量关闭/开启延迟初始化（LAZY_INIT）时的：
+- 导入 index 的耗时和第一个请求的耗时（多次取中位数）
+- python -X importtime 的导入耗时分解（index 直接导入的模块，按累计耗时排序）
+
+开启延迟初始化时导入耗时的中位数超过预算（--budget-ms，默认读取 STARTUP_BUDGET_MS，250）则以状态码 1 退出，
+可以放在部署前的检查中。
+
+示例：
+python benchmarks/bench_startup.py
+python benchmarks/bench_startup.py --runs 10 --budget-ms 300 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+from harness import API_DIR
+
+# 子进程：导入 index，再用测试客户端请求一次主页
+CHILD_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+import index
+imported = time.perf_counter()
+response = index.app.test_client().get('/')
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (time.perf_counter() - imported) * 1000,
+}))
+'''
+
+
+def child_env(lazy: bool) -> Dict[str, str]:
+    """子进程环境变量：关闭日志输出，指定延迟初始化模式"""
+    env = dict(os.environ)
+    env['LAZY_INIT'] = '1' if lazy else '0'
+    env['LOG_LEVEL'] = 'WARNING'
+    return env
+
+
+def run_once(lazy: bool) -> Dict[str, float]:
+    """
+    启动一个子进程测量一次冷启动
+
+    :param lazy: 是否开启延迟初始化
+    :return: import_ms、first_request_ms
+    """
+    output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT], cwd=API_DIR, env=child_env(lazy),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_breakdown(lazy: bool, top: int) -> List[Dict[str, Any]]:
+    """
+    用 -X importtime 统计 index 直接导入的模块
+
+    :param lazy: 是否开启延迟初始化
+    :param top: 返回的模块数量
+    :return: [{module, cumulative_ms, self_ms}]，按累计耗时降序
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import index'], cwd=API_DIR,
+                            env=child_env(lazy), capture_output=True, text=True, check=True).stderr
+    # 格式：import time: self [us] | cumulative | 缩进+模块名，缩进每层 2 个空格
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+
+    # importtime 先输出子模块再输出父模块：上一个顶层模块之后、index 之前深度为 1 的行就是它的直接导入
+    modules, first_child = [], 0
+    for index, (depth, name, self_us, cumulative_us) in enumerate(rows):
+        if depth == 0 and name != 'index':
+            first_child = index + 1
+        elif depth == 0:
+            modules = [{'module': row_name, 'cumulative_ms': round(row_cumulative / 1000, 1),
+                        'self_ms': round(row_self / 1000, 1)}
+                       for row_depth, row_name, row_self, row_cumulative in rows[first_child:index] if row_depth == 1]
+            modules.append({'module': 'index (self)', 'cumulative_ms': round(self_us / 1000, 1),
+                            'self_ms': round(self_us / 1000, 1)})
+            modules.append({'module': 'index (total)', 'cumulative_ms': round(cumulative_us / 1000, 1),
+                            'self_ms': round(self_us / 1000, 1)})
+    modules.sort(key=lambda module: module['cumulative_ms'], reverse=True)
+    return modules[:top]
+
+
+def measure(lazy: bool, runs: int, top: int) -> Dict[str, Any]:
+    """测量一种模式"""
+    samples = [run_once(lazy) for _ in range(runs)]
+    return {
+        'import_ms': round(statistics.median(sample['import_ms'] for sample in samples), 1),
+        'first_request_ms': round(statistics.median(sample['first_request_ms'] for sample in samples), 1),
+        'import_ms_max': round(max(sample['import_ms'] for sample in samples), 1),
+        'breakdown': import_breakdown(lazy, top),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动基准')
+    parser.add_argument('--runs', type=int, default=5, help='每种模式启动的子进程数')
+    parser.add_argument('--top', type=int, default=10, help='导入分解中显示的模块数')
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', '250')),
+                        help='开启延迟初始化时导入 index 的耗时预算（毫秒，中位数）')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+
+    results = {
+        'eager': measure(False, args.runs, args.top),
+        'lazy': measure(True, args.runs, args.top),
+    }
+    within_budget = results['lazy']['import_ms'] <= args.budget_ms
+
+    if args.json:
+        print(json.dumps({'budget_ms': args.budget_ms, 'within_budget': within_budget, 'results': results},
+                         ensure_ascii=False, indent=2))
+    else:
+        for mode, result in results.items():
+            print(f"== LAZY_INIT={'1' if mode == 'lazy' else '0'} ({mode}) ==")
+            print(f"  import index       {result['import_ms']:8.1f} ms (max {result['import_ms_max']:.1f})")
+            print(f"  first request (/)  {result['first_request_ms']:8.1f} ms")
+            print('  -X importtime breakdown (cumulative / self):')
+            for module in result['breakdown']:
+                print(f"    {module['module']:<24} {module['cumulative_ms']:8.1f} / {module['self_ms']:.1f} ms")
+        print(f"budget {args.budget_ms:.0f} ms: {'OK' if within_budget else 'EXCEEDED'} "
+              f"(lazy import {results['lazy']['import_ms']:.1f} ms)")
+
+    sys.exit(0 if within_budget else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+上游调用基准测试
+启动本地模拟上游，分别压测 ChongzhiProApiClient 和 api/index.py 的Flask路由，
+输出吞吐（req/s）、p50/p95/p99 延迟以及每次请求的内存分配。
+
+示例：
+python benchmarks/bench_upstream.py --target both --requests 2000 --concurrency 32 --latency-ms 20
+python benchmarks/bench_upstream.py --target routes --error-rate 0.05 --json
+"""
+
+import argparse
+import json
+import os
+import threading
+
+from harness import run_load, measure_allocations, format_report
+from fake_upstream import FakeUpstream, add_config_arguments, config_from_args
+
+
+def bench_client(args) -> dict:
+    """压测 ChongzhiProApiClient.full_recharge_process"""
+    from api_client import ChongzhiProApiClient
+
+    token = json.dumps({'accessToken': 'x' * 800, 'user': {'email': 'bench@example.com'}})
+    codes = ['BNCH-0000-0000-0000', 'BNCH-0000-0000-000U']
+    counter = iter(range(1 << 62))
+
+    def operation() -> bool:
+        code = codes[next(counter) % len(codes)]
+        return ChongzhiProApiClient().full_recharge_process(code, token)['success']
+
+    result = run_load(operation, args.requests, args.concurrency)
+    if not args.no_alloc:
+        result.update(measure_allocations(operation, args.alloc_samples))
+    return result
+
+
+def bench_routes(args) -> dict:
+    """压测 Flask 路由：验证激活码后提交JSON Token"""
+    import logging
+    import index
+
+    logging.getLogger(index.__name__).setLevel(logging.WARNING)
+    app = index.app
+    local = threading.local()
+    token = json.dumps({'accessToken': 'x' * 800, 'user': {'email': 'bench@example.com'}})
+
+    def setup():
+        local.client = app.test_client()
+
+    def operation() -> bool:
+        client = getattr(local, 'client', None) or app.test_client()
+        verify = client.post('/api/verify-code', json={'activation_code': 'BNCH-0000-0000-0000'})
+        if not verify.get_json().get('success'):
+            return False
+        submit = client.post('/api/submit-json', json={'json_token': token})
+        return bool(submit.get_json().get('success'))
+
+    result = run_load(operation, args.requests, args.concurrency, setup=setup)
+    if not args.no_alloc:
+        result.update(measure_allocations(operation, args.alloc_samples))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='上游调用基准测试（使用本地模拟上游）')
+    parser.add_argument('--target', choices=('client', 'routes', 'both'), default='both')
+    parser.add_argument('--requests', type=int, default=1000, help='总请求数')
+    parser.add_argument('--concurrency', type=int, default=16, help='并发数')
+    parser.add_argument('--alloc-samples', type=int, default=50, help='内存分配采样次数')
+    parser.add_argument('--no-alloc', action='store_true', help='跳过内存分配测量')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    results = {}
+    with FakeUpstream(config_from_args(args)) as upstream:
+        # 客户端和路由都通过环境变量指向模拟上游
+        os.environ['CHONGZHI_BASE_URL'] = upstream.base_url
+        if args.target in ('client', 'both'):
+            results['client.full_recharge_process'] = bench_client(args)
+        if args.target in ('routes', 'both'):
+            results['routes.verify_code+submit_json'] = bench_routes(args)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for title, result in results.items():
+            print(format_report(title, result))
+
+
+if __name__ == '__main__':
+    main()
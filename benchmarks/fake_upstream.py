@@ -0,0 +1,211 @@
+"""
+chongzhi.pro 本地模拟服务
+用于基准测试，不访问真实站点
+
+提供接口：
+GET/HEAD /                    主页，下发 ios_gpt_session Cookie
+POST /api-verify.php          验证激活码（激活码以 U 结尾视为已使用）
+POST /api-recharge-reuse.php  复用记录 / 更新Token并充值
+POST /simple-submit-recharge.php  第一次充值
+
+单独运行：
+python benchmarks/fake_upstream.py --port 8765 --latency-ms 50 --error-rate 0.01
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class FakeUpstreamConfig:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 homepage_size: int = 64 * 1024, payload_size: int = 0):
+        """
+        构造函数
+        :param latency_ms: 每个请求的固定延迟（毫秒）
+        :param jitter_ms: 额外随机延迟上限（毫秒）
+        :param error_rate: 返回 HTTP 500 的比例（0~1）
+        :param homepage_size: 主页正文字节数
+        :param payload_size: JSON响应中附加的填充字节数
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.homepage_size = homepage_size
+        self.payload_size = payload_size
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeChongzhi/1.0'
+    # 响应头和正文合并发送，避免 Nagle + 延迟ACK 带来的 40ms 额外延迟
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def config(self) -> FakeUpstreamConfig:
+        return self.server.config
+
+    def _delay(self):
+        delay = self.config.latency_ms
+        if self.config.jitter_ms:
+            delay += random.uniform(0, self.config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+
+    def _send(self, status: int, body: bytes, content_type: str, extra_headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_json(self, payload: dict):
+        if self.config.payload_size:
+            payload['padding'] = 'x' * self.config.payload_size
+        self._send(200, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def _maybe_fail(self) -> bool:
+        if self.config.error_rate and random.random() < self.config.error_rate:
+            self._send(500, b'<html><body>Internal Server Error</body></html>', 'text/html')
+            return True
+        return False
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(raw or b'{}')
+        except ValueError:
+            return {}
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        self._delay()
+        if self.path.split('?')[0] != '/':
+            self._send(404, b'Not Found', 'text/plain')
+            return
+        if self._maybe_fail():
+            return
+        session_id = f'fake{next(self.server.session_ids):012d}'
+        body = b'<!doctype html><html><body>' + b'x' * self.config.homepage_size + b'</body></html>'
+        self._send(200, body, 'text/html; charset=utf-8', {
+            'Set-Cookie': f'ios_gpt_session={session_id}; path=/; HttpOnly',
+        })
+
+    def do_POST(self):
+        payload = self._read_json()
+        self._delay()
+        if self._maybe_fail():
+            return
+
+        path = self.path.split('?')[0]
+        if path == '/api-verify.php':
+            code = str(payload.get('activation_code', ''))
+            if code.upper().endswith('U'):
+                self._send_json({
+                    'success': True,
+                    'data': {
+                        'code_status': 'used',
+                        'existing_record': {'bound_email_masked': 'te***@example.com'},
+                    },
+                })
+            else:
+                self._send_json({'success': True, 'data': {'code_status': 'active', 'existing_record': {}}})
+        elif path == '/api-recharge-reuse.php':
+            self._send_json({'success': True, 'message': '充值成功'})
+        elif path == '/simple-submit-recharge.php':
+            self._send_json({'success': True, 'message': '充值成功'})
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+
+
+class FakeUpstream:
+    """在后台线程中运行的模拟上游服务"""
+
+    def __init__(self, config: FakeUpstreamConfig = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        构造函数
+        :param config: 模拟行为配置
+        :param host: 监听地址
+        :param port: 监听端口，0 表示自动分配
+        """
+        self.config = config or FakeUpstreamConfig()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.config = self.config
+        self.server.session_ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeUpstream':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-upstream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakeUpstream':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """向命令行解析器添加模拟上游参数"""
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='上游固定延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='上游随机延迟上限（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='上游返回500的比例')
+    parser.add_argument('--homepage-size', type=int, default=64 * 1024, help='主页正文字节数')
+    parser.add_argument('--payload-size', type=int, default=0, help='JSON响应填充字节数')
+
+
+def config_from_args(args) -> FakeUpstreamConfig:
+    return FakeUpstreamConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        homepage_size=args.homepage_size,
+        payload_size=args.payload_size,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='chongzhi.pro 本地模拟服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    upstream = FakeUpstream(config_from_args(args), host=args.host, port=args.port)
+    print(f'模拟上游已启动: {upstream.base_url}')
+    try:
+        upstream.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        upstream.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
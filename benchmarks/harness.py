@@ -0,0 +1,173 @@
+"""
+基准测试公共工具
+并发驱动、延迟分位数统计、单次请求内存分配测量、微基准计时
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List
+
+# api/ 目录下的模块按同目录方式互相导入，基准脚本需要把它加入搜索路径
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    计算分位数（最近秩法）
+
+    :param sorted_values: 已排序的数值
+    :param pct: 百分位（0~100）
+    :return: 分位数值
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def run_load(operation: Callable[[], bool], total: int, concurrency: int,
+             setup: Callable[[], None] = None) -> Dict[str, Any]:
+    """
+    以固定并发执行 operation
+
+    :param operation: 单次请求，返回是否成功
+    :param total: 总请求数
+    :param concurrency: 并发线程数
+    :param setup: 每个工作线程启动时调用一次（可选）
+    :return: 吞吐、延迟分位数和成功率
+    """
+    latencies: List[float] = []
+    failures = 0
+    lock = threading.Lock()
+    counter = iter(range(total))
+    local = threading.local()
+
+    def worker():
+        nonlocal failures
+        if setup and not getattr(local, 'ready', False):
+            setup()
+            local.ready = True
+        own_latencies = []
+        own_failures = 0
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            start = time.perf_counter()
+            try:
+                ok = operation()
+            except Exception:
+                ok = False
+            own_latencies.append(time.perf_counter() - start)
+            if not ok:
+                own_failures += 1
+        with lock:
+            latencies.extend(own_latencies)
+            failures += own_failures
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'failures': failures,
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def measure_allocations(operation: Callable[[], Any], samples: int = 50) -> Dict[str, Any]:
+    """
+    单线程顺序执行 operation，测量每次请求的内存分配
+
+    :param operation: 单次请求
+    :param samples: 采样次数
+    :return: 每次请求分配的峰值内存和残留内存（中位数，KiB）
+    """
+    # 预热，避免把首次导入、建连的开销算进去
+    operation()
+
+    peaks: List[int] = []
+    retained: List[int] = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            operation()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+            retained.append(current - base)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'alloc_peak_kib_per_request': round(statistics.median(peaks) / 1024, 1),
+        'retained_kib_per_request': round(statistics.median(retained) / 1024, 1),
+    }
+
+
+def time_per_call(operation: Callable[[], Any], calls: int, repeats: int = 5) -> float:
+    """
+    多轮计时取中位数
+
+    :return: 每次调用耗时（纳秒）
+    """
+    results = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        results.append((time.perf_counter() - start) / calls * 1e9)
+    return statistics.median(results)
+
+
+def allocations_per_call(operation: Callable[[], Any], calls: int) -> Dict[str, float]:
+    """
+    测量每次调用的内存分配
+
+    :return: 峰值（单次调用的临时分配）和保留（返回值大小），字节
+    """
+    operation()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+
+        kept = []
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(calls):
+            kept.append(operation())
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'peak_bytes_per_call': peak - base,
+        'retained_bytes_per_call': round((current - base) / calls, 1),
+    }
+
+
+def format_report(title: str, result: Dict[str, Any]) -> str:
+    """格式化单个场景的结果"""
+    lines = [f'== {title} ==']
+    for key, value in result.items():
+        lines.append(f'  {key:<28} {value}')
+    return '\n'.join(lines)